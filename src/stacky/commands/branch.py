@@ -18,7 +18,7 @@ def cmd_branch_new(stack: StackBranchSet, args):
     assert b.commit
     name = args.name
     create_branch(name)
-    run(CmdArgs(["git", "update-ref", "refs/stack-parent/{}".format(name), b.commit, ""]))
+    run(CmdArgs(["git", "update-ref", f"refs/stack-parent/{name}", b.commit, ""]))
 
 
 def cmd_branch_commit(stack: StackBranchSet, args):
@@ -28,7 +28,7 @@ def cmd_branch_commit(stack: StackBranchSet, args):
     assert b.commit
     name = args.name
     create_branch(name)
-    run(CmdArgs(["git", "update-ref", "refs/stack-parent/{}".format(name), b.commit, ""]))
+    run(CmdArgs(["git", "update-ref", f"refs/stack-parent/{name}", b.commit, ""]))
 
     # Update global CURRENT_BRANCH since we just checked out the new branch
     set_current_branch(BranchName(name))
@@ -1,16 +1,17 @@
 """Fold command - fold branch into parent."""
 
-import json
 import os
-from typing import List
+from typing import List, Optional
 
 from stacky.git.branch import checkout, get_current_branch_name, set_current_branch
-from stacky.git.refs import get_commit, get_commits_between, set_parent, set_parent_commit
+from stacky.git.catfile import resolve_ref
+from stacky.git.refs import UpdateRefTxn, get_commit, get_commits_between, set_parent
 from stacky.stack.models import StackBranch, StackBranchSet
 from stacky.utils.config import get_config
 from stacky.utils.logging import cout, die, info
-from stacky.utils.shell import run
-from stacky.utils.types import BranchName, CmdArgs, STACK_BOTTOMS, STATE_FILE, TMP_STATE_FILE
+from stacky.utils.shell import run, run_always_return
+from stacky.utils.state import save_state
+from stacky.utils.types import BranchName, CmdArgs, Commit, STACK_BOTTOMS
 
 
 def cmd_fold(stack: StackBranchSet, args):
@@ -40,7 +41,7 @@ def cmd_fold(stack: StackBranchSet, args):
     else:
         cout("Folding {} commits from {} into {}\n", len(commits_to_apply), b.name, b.parent.name, fg="green")
 
-    children = list(b.children)
+    children = list(b.children.values())
     if children:
         cout("Reparenting {} children to {}\n", len(children), b.parent.name, fg="yellow")
         for child in children:
@@ -65,16 +66,14 @@ def inner_do_merge_fold(stack: StackBranchSet, fold_branch_name: BranchName, par
     print()
     current_branch = get_current_branch_name()
 
-    with open(TMP_STATE_FILE, "w") as f:
-        json.dump({
-            "branch": current_branch,
-            "merge_fold": {
-                "fold_branch": fold_branch_name,
-                "parent_branch": parent_branch_name,
-                "children": children_names,
-            }
-        }, f)
-    os.replace(TMP_STATE_FILE, STATE_FILE)
+    save_state({
+        "branch": current_branch,
+        "merge_fold": {
+            "fold_branch": fold_branch_name,
+            "parent_branch": parent_branch_name,
+            "children": children_names,
+        }
+    })
 
     cout("Merging {} into {}\n", fold_branch_name, parent_branch_name, fg="green")
     result = run(CmdArgs(["git", "merge", fold_branch_name]), check=False)
@@ -96,30 +95,20 @@ def finish_merge_fold_operation(stack: StackBranchSet, fold_branch_name: BranchN
 
     parent_branch.commit = get_commit(parent_branch_name)
 
-    for child_name in children_names:
-        if child_name in stack.stack:
-            child = stack.stack[child_name]
-            info("Reparenting {} from {} to {}", child.name, fold_branch.name, parent_branch.name)
-            child.parent = parent_branch
-            parent_branch.children.add(child)
-            fold_branch.children.discard(child)
-            set_parent(child.name, parent_branch.name)
-            set_parent_commit(child.name, parent_branch.commit, child.parent_commit)
-            child.parent_commit = parent_branch.commit
-
-    parent_branch.children.discard(fold_branch)
-
-    info("Deleting branch {}", fold_branch.name)
-    run(CmdArgs(["git", "branch", "-D", fold_branch.name]))
-    run(CmdArgs(["git", "update-ref", "-d", "refs/stack-parent/{}".format(fold_branch.name)]))
-    stack.remove(fold_branch.name)
+    _remove_folded_branch(stack, fold_branch, parent_branch, children_names)
 
     cout("✓ Successfully merged and folded {} into {}\n", fold_branch.name, parent_branch.name, fg="green")
 
 
 def inner_do_fold(stack: StackBranchSet, fold_branch_name: BranchName, parent_branch_name: BranchName,
-                  commits_to_apply: List[str], children_names: List[BranchName], allow_empty: bool):
-    """Cherry-pick based fold operation."""
+                  commits_to_apply: List[str], children_names: List[BranchName], allow_empty: bool,
+                  onto: Optional[Commit] = None):
+    """Cherry-pick based fold operation.
+
+    All commits are picked, oldest first, by a single `git cherry-pick`. `onto`
+    is the parent's commit before picking; it's only passed when resuming from
+    `stacky continue`, where git's sequencer already knows what is left to do.
+    """
     print()
     current_branch = get_current_branch_name()
 
@@ -127,45 +116,95 @@ def inner_do_fold(stack: StackBranchSet, fold_branch_name: BranchName, parent_br
         finish_fold_operation(stack, fold_branch_name, parent_branch_name, children_names)
         return
 
-    while commits_to_apply:
-        with open(TMP_STATE_FILE, "w") as f:
-            json.dump({
-                "branch": current_branch,
-                "fold": {
-                    "fold_branch": fold_branch_name,
-                    "parent_branch": parent_branch_name,
-                    "commits": commits_to_apply,
-                    "children": children_names,
-                    "allow_empty": allow_empty
-                }
-            }, f)
-        os.replace(TMP_STATE_FILE, STATE_FILE)
-
-        commit = commits_to_apply.pop()
-
-        # Check if commit would be empty
-        dry_run_result = run(CmdArgs(["git", "cherry-pick", "--no-commit", commit]), check=False)
-        if dry_run_result is not None:
-            has_changes = run(CmdArgs(["git", "diff", "--cached", "--quiet"]), check=False) is None
-            run(CmdArgs(["git", "reset", "--hard", "HEAD"]))
-            if not has_changes:
-                cout("Skipping empty commit {}\n", commit[:8], fg="yellow")
-                continue
-        else:
-            run(CmdArgs(["git", "reset", "--hard", "HEAD"]), check=False)
-
-        cout("Cherry-picking commit {}\n", commit[:8], fg="green")
+    if onto is not None and _cherry_pick_in_progress():
+        cout("Resuming cherry-pick into {}\n", parent_branch_name, fg="green")
+        result = run(CmdArgs(["git", "cherry-pick", "--continue"]), check=False)
+    elif onto is not None and get_commit(parent_branch_name) != onto:
+        # The user already finished the sequence with `git cherry-pick --continue`.
+        result = ""
+    else:
+        save_state({
+            "branch": current_branch,
+            "fold": {
+                "fold_branch": fold_branch_name,
+                "parent_branch": parent_branch_name,
+                "commits": commits_to_apply,
+                "children": children_names,
+                "allow_empty": allow_empty,
+                "onto": get_commit(parent_branch_name),
+            }
+        })
+        cout("Cherry-picking {} commits into {}\n", len(commits_to_apply), parent_branch_name, fg="green")
         cherry_pick_cmd = ["git", "cherry-pick"]
         if allow_empty:
             cherry_pick_cmd.append("--allow-empty")
-        cherry_pick_cmd.append(commit)
+        cherry_pick_cmd.extend(commits_to_apply)
         result = run(CmdArgs(cherry_pick_cmd), check=False)
-        if result is None:
-            die("Cherry-pick failed for commit {}. Please resolve conflicts and run `stacky continue`", commit)
+
+    while result is None:
+        commit = resolve_ref("CHERRY_PICK_HEAD")
+        # Commits that are (or became) empty stop the pick without a conflict;
+        # skipping them lets git carry on with the rest of the sequence.
+        if commit is not None and _cherry_pick_stopped_empty():
+            cout("Skipping empty commit {}\n", commit[:8], fg="yellow")
+            result = run(CmdArgs(["git", "cherry-pick", "--skip"]), check=False)
+            continue
+        die(
+            "Cherry-pick failed for commit {}. Please resolve conflicts and run `stacky continue`",
+            commit or fold_branch_name,
+        )
 
     finish_fold_operation(stack, fold_branch_name, parent_branch_name, children_names)
 
 
+def _remove_folded_branch(stack: StackBranchSet, fold_branch: StackBranch, parent_branch: StackBranch,
+                          children_names: List[BranchName]):
+    """Move the folded branch's children onto its parent and delete the folded branch.
+
+    The stack-parent refs change in a single ref transaction, which also checks
+    that the folded branch hasn't moved; branch config is only rewritten after
+    that succeeds.
+    """
+    children = [stack.stack[name] for name in children_names if name in stack.stack]
+    txn = UpdateRefTxn()
+    for child in children:
+        txn.update(f"refs/stack-parent/{child.name}", parent_branch.commit, child.parent_commit)
+    txn.delete(f"refs/stack-parent/{fold_branch.name}")
+    # Refuse to go on if the branch moved since the stack was loaded.
+    txn.verify(f"refs/heads/{fold_branch.name}", fold_branch.commit)
+    txn.commit()
+
+    for child in children:
+        info("Reparenting {} from {} to {}", child.name, fold_branch.name, parent_branch.name)
+        child.parent = parent_branch
+        set_parent(child.name, parent_branch.name)
+        child.parent_commit = parent_branch.commit
+    info("Deleting branch {}", fold_branch.name)
+    # Unlike deleting the ref directly, this refuses if the branch is checked out in another worktree.
+    run(CmdArgs(["git", "branch", "-D", fold_branch.name]))
+
+    fold_branch.children.clear()
+    parent_branch.children.pop(fold_branch.name, None)
+    stack.add_children(parent_branch, children)
+    stack.remove(fold_branch.name)
+
+
+def _cherry_pick_in_progress() -> bool:
+    """Check whether a cherry-pick is stopped, or has commits left in git's sequencer."""
+    if resolve_ref("CHERRY_PICK_HEAD") is not None:
+        return True
+    # Committing a resolved conflict by hand clears CHERRY_PICK_HEAD but keeps the todo list.
+    sequencer = run_always_return(CmdArgs(["git", "rev-parse", "--git-path", "sequencer"]))
+    return os.path.isdir(sequencer)
+
+
+def _cherry_pick_stopped_empty() -> bool:
+    """Check whether a stopped cherry-pick has nothing to commit and no conflicts."""
+    if run(CmdArgs(["git", "ls-files", "--unmerged"])):
+        return False
+    return run(CmdArgs(["git", "diff", "--cached", "--quiet"]), check=False) is not None
+
+
 def finish_fold_operation(stack: StackBranchSet, fold_branch_name: BranchName,
                           parent_branch_name: BranchName, children_names: List[BranchName]):
     """Complete fold operation after commits applied."""
@@ -178,22 +217,6 @@ def finish_fold_operation(stack: StackBranchSet, fold_branch_name: BranchName,
 
     parent_branch.commit = get_commit(parent_branch_name)
 
-    for child_name in children_names:
-        if child_name in stack.stack:
-            child = stack.stack[child_name]
-            info("Reparenting {} from {} to {}", child.name, fold_branch.name, parent_branch.name)
-            child.parent = parent_branch
-            parent_branch.children.add(child)
-            fold_branch.children.discard(child)
-            set_parent(child.name, parent_branch.name)
-            set_parent_commit(child.name, parent_branch.commit, child.parent_commit)
-            child.parent_commit = parent_branch.commit
-
-    parent_branch.children.discard(fold_branch)
-
-    info("Deleting branch {}", fold_branch.name)
-    run(CmdArgs(["git", "branch", "-D", fold_branch.name]))
-    run(CmdArgs(["git", "update-ref", "-d", "refs/stack-parent/{}".format(fold_branch.name)]))
-    stack.remove(fold_branch.name)
+    _remove_folded_branch(stack, fold_branch, parent_branch, children_names)
 
     cout("✓ Successfully folded {} into {}\n", fold_branch.name, parent_branch.name, fg="green")
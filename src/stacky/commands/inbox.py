@@ -1,37 +1,101 @@
 """Inbox commands - inbox, prs."""
 
 import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import Iterator, List, Tuple
 
 from simple_term_menu import TerminalMenu  # type: ignore
 
+from stacky.pr.cache import cached_gh
 from stacky.pr.github import edit_pr_description
 from stacky.stack.models import StackBranchSet
-from stacky.utils.logging import IS_TERMINAL, cout, die
-from stacky.utils.shell import run_always_return
-from stacky.utils.types import CmdArgs
+from stacky.utils.logging import COLOR_STDOUT, IS_TERMINAL, cout, die, fmt
+
+# Only request what each command renders; `body` in particular can dwarf the rest.
+INBOX_FIELDS = (
+    "number", "title", "headRefName", "baseRefName", "url", "createdAt", "updatedAt",
+    "author", "isDraft", "reviewDecision", "reviewRequests", "statusCheckRollup",
+)
+_INBOX_FIELDS_CSV = ",".join(INBOX_FIELDS)
+_PRS_NODE = "nodes { ... on PullRequest { number title body url } }"
+_PRS_QUERY = (
+    "query($mine: String!, $review: String!) { "
+    f"mine: search(query: $mine, type: ISSUE, first: 100) {{ {_PRS_NODE} }} "
+    f"review: search(query: $review, type: ISSUE, first: 100) {{ {_PRS_NODE} }} }}"
+)
+
+_BY_UPDATED_AT = itemgetter("updatedAt")
+# OSC 8 hyperlink around the PR number, so it's clickable in supporting terminals.
+_PR_LINK = "\033]8;;%s\033\\\033[96m#%s\033[0m\033]8;;\033\\"
+_FAILED_STATES = frozenset(["FAILURE", "ERROR"])
+_PENDING_STATES = frozenset(["PENDING", "QUEUED"])
+
+
+def fetch_inbox_prs(fields_csv: str) -> Iterator[List[dict]]:
+    """Yield open PRs authored by, then awaiting review from, the current user.
+
+    The two `gh pr list` calls are independent, so they run concurrently, and
+    their output is briefly cached so back-to-back `inbox`/`prs` runs are cheap.
+    The authored list is yielded as soon as it arrives, so callers can show it
+    while the review query is still in flight.
+    """
+    base = ["gh", "pr", "list", "--json", fields_csv, "--state", "open"]
+    queries = [
+        ("inbox_mine", base + ["--author", "@me"]),
+        ("inbox_review", base + ["--search", "review-requested:@me"]),
+    ]
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        futures = [executor.submit(cached_gh, key, argv) for key, argv in queries]
+        for f in futures:
+            yield json.loads(f.result())
+
+
+def fetch_editable_prs() -> Tuple[List[dict], List[dict]]:
+    """Fetch number, title, body and url of the user's authored and review-requested PRs.
+
+    Both searches go in one GraphQL request, so `prs` costs a single round-trip.
+    """
+    search = "repo:{owner}/{repo} is:pr is:open sort:created-desc"
+    argv = [
+        "gh", "api", "graphql",
+        "-F", f"mine={search} author:@me",
+        "-F", f"review={search} review-requested:@me",
+        "-f", f"query={_PRS_QUERY}",
+    ]
+    data = json.loads(cached_gh("prs", argv))["data"]
+    return data["mine"]["nodes"], data["review"]["nodes"]
+
+
+def get_check_status(pr) -> Tuple[str, str]:
+    """Summarize a PR's status check rollup as (text, color) in a single pass."""
+    seen = pending = False
+    all_success = True
+    for check in pr.get("statusCheckRollup") or ():
+        if not isinstance(check, dict) or "state" not in check:
+            continue
+        seen = True
+        state = check["state"]
+        if state in _FAILED_STATES:
+            return "✗ Checks failed", "red"
+        if state in _PENDING_STATES:
+            pending = True
+        elif state != "SUCCESS":
+            all_success = False
+    if not seen:
+        return "", "gray"
+    if pending:
+        return "⏳ Checks running", "yellow"
+    if all_success:
+        return "✓ Checks passed", "green"
+    return "Checks mixed", "yellow"
 
 
 def cmd_inbox(stack: StackBranchSet, args):
     """List all active GitHub pull requests for the current user."""
-    fields = [
-        "number", "title", "headRefName", "baseRefName", "state", "url",
-        "createdAt", "updatedAt", "author", "reviewDecision", "reviewRequests",
-        "mergeable", "mergeStateStatus", "statusCheckRollup", "isDraft", "body"
-    ]
-
-    my_prs_data = json.loads(
-        run_always_return(CmdArgs([
-            "gh", "pr", "list", "--json", ",".join(fields),
-            "--state", "open", "--author", "@me"
-        ]))
-    )
-
-    review_prs_data = json.loads(
-        run_always_return(CmdArgs([
-            "gh", "pr", "list", "--json", ",".join(fields),
-            "--state", "open", "--search", "review-requested:@me"
-        ]))
-    )
+    batches = fetch_inbox_prs(_INBOX_FIELDS_CSV)
+    my_prs_data = next(batches)
 
     # Categorize PRs
     waiting_on_me = []
@@ -39,64 +103,58 @@ def cmd_inbox(stack: StackBranchSet, args):
     approved = []
 
     for pr in my_prs_data:
-        if pr.get("isDraft", False):
+        if pr.get("isDraft"):
             waiting_on_me.append(pr)
         elif pr["reviewDecision"] == "APPROVED":
             approved.append(pr)
-        elif pr["reviewRequests"] and len(pr["reviewRequests"]) > 0:
+        elif pr["reviewRequests"]:
             waiting_on_review.append(pr)
         else:
             waiting_on_me.append(pr)
 
     # Sort by updatedAt
-    for lst in [waiting_on_me, waiting_on_review, approved, review_prs_data]:
-        lst.sort(key=lambda pr: pr["updatedAt"], reverse=True)
-
-    def get_check_status(pr):
-        if not pr.get("statusCheckRollup") or len(pr.get("statusCheckRollup")) == 0:
-            return "", "gray"
-        rollup = pr["statusCheckRollup"]
-        states = [check["state"] for check in rollup if isinstance(check, dict) and "state" in check]
-        if not states:
-            return "", "gray"
-        if "FAILURE" in states or "ERROR" in states:
-            return "✗ Checks failed", "red"
-        elif "PENDING" in states or "QUEUED" in states:
-            return "⏳ Checks running", "yellow"
-        elif all(state == "SUCCESS" for state in states):
-            return "✓ Checks passed", "green"
-        return "Checks mixed", "yellow"
+    for lst in [waiting_on_me, waiting_on_review, approved]:
+        lst.sort(key=_BY_UPDATED_AT, reverse=True)
+
+    # Render each part into a buffer and write it out in one go.
+    buf: List[str] = []
+
+    def emit(*args, **kwargs):
+        buf.append(fmt(*args, color=COLOR_STDOUT, **kwargs))
+
+    def flush():
+        sys.stdout.write("".join(buf))
+        sys.stdout.flush()
+        buf.clear()
 
     def display_pr_compact(pr, show_author=False):
         check_text, check_color = get_check_status(pr)
-        pr_number_text = f"#{pr['number']}"
-        clickable_number = f"\033]8;;{pr['url']}\033\\\033[96m{pr_number_text}\033[0m\033]8;;\033\\"
-        cout("{} ", clickable_number)
-        cout("{} ", pr["title"], fg="white")
-        cout("({}) ", pr["headRefName"], fg="gray")
+        clickable_number = _PR_LINK % (pr["url"], pr["number"])
+        emit("{} ", clickable_number)
+        emit("{} ", pr["title"], fg="white")
+        emit("({}) ", pr["headRefName"], fg="gray")
         if show_author:
-            cout("by {} ", pr["author"]["login"], fg="gray")
+            emit("by {} ", pr["author"]["login"], fg="gray")
         if pr.get("isDraft", False):
-            cout("[DRAFT] ", fg="orange")
+            emit("[DRAFT] ", fg="orange")
         if check_text:
-            cout("{} ", check_text, fg=check_color)
-        cout("Updated: {}\n", pr["updatedAt"][:10], fg="gray")
+            emit("{} ", check_text, fg=check_color)
+        emit("Updated: {}\n", pr["updatedAt"][:10], fg="gray")
 
     def display_pr_full(pr, show_author=False):
         check_text, check_color = get_check_status(pr)
-        pr_number_text = f"#{pr['number']}"
-        clickable_number = f"\033]8;;{pr['url']}\033\\\033[96m{pr_number_text}\033[0m\033]8;;\033\\"
-        cout("{} ", clickable_number)
-        cout("{}\n", pr["title"], fg="white")
-        cout("  {} -> {}\n", pr["headRefName"], pr["baseRefName"], fg="gray")
+        clickable_number = _PR_LINK % (pr["url"], pr["number"])
+        emit("{} ", clickable_number)
+        emit("{}\n", pr["title"], fg="white")
+        emit("  {} -> {}\n", pr["headRefName"], pr["baseRefName"], fg="gray")
         if show_author:
-            cout("  Author: {}\n", pr["author"]["login"], fg="gray")
+            emit("  Author: {}\n", pr["author"]["login"], fg="gray")
         if pr.get("isDraft", False):
-            cout("  [DRAFT]\n", fg="orange")
+            emit("  [DRAFT]\n", fg="orange")
         if check_text:
-            cout("  {}\n", check_text, fg=check_color)
-        cout("  {}\n", pr["url"], fg="blue")
-        cout("  Updated: {}, Created: {}\n\n", pr["updatedAt"][:10], pr["createdAt"][:10], fg="gray")
+            emit("  {}\n", check_text, fg=check_color)
+        emit("  {}\n", pr["url"], fg="blue")
+        emit("  Updated: {}, Created: {}\n\n", pr["updatedAt"][:10], pr["createdAt"][:10], fg="gray")
 
     def display_pr_list(prs, show_author=False):
         for pr in prs:
@@ -106,49 +164,38 @@ def cmd_inbox(stack: StackBranchSet, args):
                 display_pr_full(pr, show_author)
 
     if waiting_on_me:
-        cout("Your PRs - Waiting on You:\n", fg="red")
+        emit("Your PRs - Waiting on You:\n", fg="red")
         display_pr_list(waiting_on_me)
-        cout("\n")
+        emit("\n")
     if waiting_on_review:
-        cout("Your PRs - Waiting on Review:\n", fg="yellow")
+        emit("Your PRs - Waiting on Review:\n", fg="yellow")
         display_pr_list(waiting_on_review)
-        cout("\n")
+        emit("\n")
     if approved:
-        cout("Your PRs - Approved:\n", fg="green")
+        emit("Your PRs - Approved:\n", fg="green")
         display_pr_list(approved)
-        cout("\n")
+        emit("\n")
     if not my_prs_data:
-        cout("No active pull requests authored by you.\n", fg="green")
+        emit("No active pull requests authored by you.\n", fg="green")
+    # Show the user's own PRs while the review query finishes.
+    flush()
+
+    review_prs_data = next(batches)
+    review_prs_data.sort(key=_BY_UPDATED_AT, reverse=True)
     if review_prs_data:
-        cout("Pull Requests Awaiting Your Review:\n", fg="yellow")
+        emit("Pull Requests Awaiting Your Review:\n", fg="yellow")
         display_pr_list(review_prs_data, show_author=True)
     else:
-        cout("No pull requests awaiting your review.\n", fg="yellow")
+        emit("No pull requests awaiting your review.\n", fg="yellow")
+    flush()
 
 
 def cmd_prs(stack: StackBranchSet, args):
     """Interactive PR management - select and edit PR descriptions."""
-    fields = [
-        "number", "title", "headRefName", "baseRefName", "state", "url",
-        "createdAt", "updatedAt", "author", "reviewDecision", "reviewRequests",
-        "mergeable", "mergeStateStatus", "statusCheckRollup", "isDraft", "body"
-    ]
+    my_prs_data, review_prs_data = fetch_editable_prs()
 
-    my_prs_data = json.loads(
-        run_always_return(CmdArgs([
-            "gh", "pr", "list", "--json", ",".join(fields),
-            "--state", "open", "--author", "@me"
-        ]))
-    )
-
-    review_prs_data = json.loads(
-        run_always_return(CmdArgs([
-            "gh", "pr", "list", "--json", ",".join(fields),
-            "--state", "open", "--search", "review-requested:@me"
-        ]))
-    )
-
-    all_prs = my_prs_data + review_prs_data
+    # A PR can be both authored by and awaiting review from the user; list it once.
+    all_prs = list({pr["number"]: pr for pr in my_prs_data + review_prs_data}.values())
     if not all_prs:
         cout("No active pull requests found.\n", fg="green")
         return
@@ -156,8 +203,7 @@ def cmd_prs(stack: StackBranchSet, args):
     if not IS_TERMINAL:
         die("Interactive PR management requires a terminal")
 
-    menu_options = [f"#{pr['number']} {pr['title']}" for pr in all_prs]
-    menu_options.append("Exit")
+    menu_options = [f"#{pr['number']} {pr['title']}" for pr in all_prs] + ["Exit"]
 
     while True:
         cout("\nSelect a PR to edit its description:\n", fg="cyan")
@@ -3,11 +3,12 @@
 import sys
 
 from stacky.git.branch import get_current_branch_name
+from stacky.pr.cache import clear_gh_cache
 from stacky.stack.models import StackBranchSet
 from stacky.stack.tree import get_current_downstack_as_forest
 from stacky.utils.logging import COLOR_STDOUT, cout, die, fmt
 from stacky.utils.shell import run
-from stacky.utils.types import CmdArgs, Commit
+from stacky.utils.types import CmdArgs
 from stacky.utils.ui import confirm
 
 
@@ -23,7 +24,7 @@ def cmd_land(stack: StackBranchSet, args):
         _, (b, p) = next(iter(p.items()))
         branches.append(b)
     assert branches
-    assert branches[0] in stack.bottoms
+    assert branches[0].name in stack.bottoms
     if len(branches) == 1:
         die("May not land {}", branches[0].name)
 
@@ -39,7 +40,7 @@ def cmd_land(stack: StackBranchSet, args):
             b.name,
         )
 
-    b.load_pr_info()
+    b.load_pr_info(minimal=True)
     pr = b.open_pr_info
     if not pr:
         die("Branch {} does not have an open PR", b.name)
@@ -67,11 +68,11 @@ def cmd_land(stack: StackBranchSet, args):
     if not args.force:
         confirm()
 
-    v = run(CmdArgs(["git", "rev-parse", b.name]))
-    assert v is not None
-    head_commit = Commit(v)
-    cmd = CmdArgs(["gh", "pr", "merge", b.name, "--squash", "--match-head-commit", head_commit])
+    # b.commit was resolved when the stack was loaded and is the commit checked against the remote above.
+    cmd = CmdArgs(["gh", "pr", "merge", b.name, "--squash", "--match-head-commit", b.commit])
     if args.auto:
         cmd.append("--auto")
     run(cmd, out=True)
+    # The landed PR is no longer open; don't let `inbox`/`prs` show it from cache.
+    clear_gh_cache()
     cout("\n✓ Success! Run `stacky update` to update local state.\n", fg="green")
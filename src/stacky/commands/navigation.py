@@ -40,7 +40,7 @@ def cmd_branch_up(stack: StackBranchSet, args):
         if not IS_TERMINAL:
             die(
                 "Branch {} has multiple children: {}",
-                current_branch, ", ".join(c.name for c in b.children),
+                current_branch, ", ".join(b.children),
             )
         cout(
             "Branch {} has {} children, choose one\n",
@@ -48,11 +48,11 @@ def cmd_branch_up(stack: StackBranchSet, args):
         )
         forest = BranchesTreeForest([
             BranchesTree({BranchName(c.name): (c, BranchesTree({}))})
-            for c in b.children
+            for c in b.children.values()
         ])
         child = menu_choose_branch(forest).name
     else:
-        child = next(iter(b.children)).name
+        child = next(iter(b.children))
     checkout(child)
 
 
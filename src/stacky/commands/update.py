@@ -1,15 +1,18 @@
 """Update commands - update, import, adopt."""
 
+from typing import List, Tuple
+
 from stacky.git.branch import get_current_branch_name, get_real_stack_bottom, set_current_branch
-from stacky.git.refs import get_merge_base, set_parent, set_parent_commit
+from stacky.git.catfile import resolve_ref
+from stacky.git.refs import get_merge_base, set_parent, set_parent_commit, update_refs
 from stacky.git.remote import start_muxed_ssh, stop_muxed_ssh
-from stacky.pr.github import get_pr_info
+from stacky.pr.github import fetch_open_prs_by_head, get_pr_info
 from stacky.stack.models import StackBranch, StackBranchSet
 from stacky.stack.operations import cleanup_unused_refs, delete_branches, get_branches_to_delete
 from stacky.stack.tree import get_bottom_level_branches_as_forest, load_pr_info_for_forest
 from stacky.utils.config import get_config
 from stacky.utils.logging import cout, die, info
-from stacky.utils.shell import run, run_always_return
+from stacky.utils.shell import run
 from stacky.utils.types import BranchName, CmdArgs, Commit, FROZEN_STACK_BOTTOMS, STACK_BOTTOMS
 from stacky.utils.ui import confirm
 
@@ -22,16 +25,9 @@ def cmd_update(stack: StackBranchSet, args):
     run(CmdArgs(["git", "fetch", remote]))
 
     current_branch = get_current_branch_name()
-    for b in stack.bottoms:
-        run(
-            CmdArgs([
-                "git", "update-ref",
-                "refs/heads/{}".format(b.name),
-                "refs/remotes/{}/{}".format(remote, b.remote_branch),
-            ])
-        )
-        if b.name == current_branch:
-            run(CmdArgs(["git", "reset", "--hard", "HEAD"]))
+    update_refs([(f"refs/heads/{b.name}", f"refs/remotes/{remote}/{b.remote_branch}") for b in stack.bottoms.values()])
+    if current_branch in stack.bottoms:
+        run(CmdArgs(["git", "reset", "--hard", "HEAD"]))
 
     info("Checking if any PRs have been merged and can be deleted")
     forest = get_bottom_level_branches_as_forest(stack)
@@ -48,15 +44,25 @@ def cmd_update(stack: StackBranchSet, args):
     cleanup_unused_refs(stack)
 
 
-def cmd_import(stack: StackBranchSet, args):
-    """Import Graphite stack."""
-    branch = args.name
+def _resolve_import_chain(
+    stack: StackBranchSet, branch: BranchName
+) -> Tuple[BranchName, List[Tuple[BranchName, Commit]]]:
+    """Follow open PR bases down from a branch, returning the stack bottom and (branch, parent commit) pairs."""
     branches = []
-    bottoms = set(b.name for b in stack.bottoms)
-    while branch not in bottoms:
-        pr_info = get_pr_info(branch, full=True)
-        open_pr = pr_info.open
+    open_prs_by_head = fetch_open_prs_by_head()
+    while branch not in stack.bottoms:
         info("Getting PR information for {}", branch)
+        open_prs = open_prs_by_head.get(branch)
+        if open_prs is None:
+            # Not among the PRs fetched up front (or has none); ask about this branch directly.
+            open_pr = get_pr_info(branch, full=True).open
+        elif len(open_prs) > 1:
+            die(
+                "Branch {} has more than one open PR: {}",
+                branch, ", ".join([str(pr) for pr in open_prs]),
+            )
+        else:
+            open_pr = open_prs[0]
         if open_pr is None:
             die("Branch {} has no open PR", branch)
             assert open_pr is not None
@@ -68,15 +74,23 @@ def cmd_import(stack: StackBranchSet, args):
         if not open_pr["commits"]:
             die("PR #{} has no commits", open_pr["number"])
         first_commit = open_pr["commits"][0]["oid"]
-        parent_commit = Commit(run_always_return(CmdArgs(["git", "rev-parse", "{}^".format(first_commit)])))
-        next_branch = open_pr["baseRefName"]
+        parent_commit = resolve_ref(f"{first_commit}^")
+        if parent_commit is None:
+            die("Parent of PR #{} first commit {} not found locally; fetch first", open_pr["number"], first_commit)
+            assert parent_commit is not None
+        next_branch = BranchName(open_pr["baseRefName"])
         info(
             "Branch {}: PR #{}, parent is {} at commit {}",
             branch, open_pr["number"], next_branch, parent_commit,
         )
         branches.append((branch, parent_commit))
         branch = next_branch
+    return branch, branches
+
 
+def cmd_import(stack: StackBranchSet, args):
+    """Import Graphite stack."""
+    branch, branches = _resolve_import_chain(stack, args.name)
     if not branches:
         return
 
@@ -119,8 +133,8 @@ def cmd_adopt(stack: StackBranch, args):
 
     if branch in STACK_BOTTOMS:
         if branch in FROZEN_STACK_BOTTOMS:
-            die("Cannot adopt frozen stack bottoms {}".format(FROZEN_STACK_BOTTOMS))
-        run(CmdArgs(["git", "update-ref", "-d", "refs/stacky-bottom-branch/{}".format(branch)]))
+            die("Cannot adopt frozen stack bottoms {}", FROZEN_STACK_BOTTOMS)
+        run(CmdArgs(["git", "update-ref", "-d", f"refs/stacky-bottom-branch/{branch}"]))
 
     parent_commit = get_merge_base(current_branch, branch)
     set_parent(branch, current_branch, set_origin=True)
@@ -5,7 +5,7 @@ from stacky.git.refs import set_parent
 from stacky.stack.models import StackBranchSet
 from stacky.stack.operations import do_push, do_sync
 from stacky.stack.tree import (
-    forest_depth_first, get_current_upstack_as_forest,
+    get_current_upstack_as_forest,
     load_pr_info_for_forest, print_forest
 )
 from stacky.utils.logging import die, info
@@ -43,10 +43,13 @@ def cmd_upstack_onto(stack: StackBranchSet, args):
     if not b.parent:
         die("may not upstack a stack bottom, use stacky adopt")
     target = stack.stack[args.target]
-    upstack = get_current_upstack_as_forest(stack)
-    for ub in forest_depth_first(upstack):
-        if ub == target:
+    # The target is upstack of b exactly when b is on the target's parent chain.
+    p = target
+    while p:
+        if p == b:
             die("Target branch {} is upstack of {}", target.name, b.name)
+        p = p.parent
+    upstack = get_current_upstack_as_forest(stack)
     b.parent = target
     set_parent(b.name, target.name)
     do_sync(upstack)
@@ -64,8 +67,8 @@ def cmd_upstack_as_base(stack: StackBranchSet):
     stack.addStackBranch(b)
     set_parent(b.name, None)
 
-    run(CmdArgs(["git", "update-ref", "refs/stacky-bottom-branch/{}".format(b.name), b.commit, ""]))
-    info("Set {} as new bottom branch".format(b.name))
+    run(CmdArgs(["git", "update-ref", f"refs/stacky-bottom-branch/{b.name}", b.commit, ""]))
+    info("Set {} as new bottom branch", b.name)
 
 
 def cmd_upstack_as(stack: StackBranchSet, args):
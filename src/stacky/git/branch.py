@@ -1,6 +1,6 @@
 """Branch operations for stacky."""
 
-from typing import List, Optional
+from typing import List, Optional, cast
 
 from stacky.utils.logging import info
 from stacky.utils.shell import remove_prefix, run, run_always_return, run_multiline
@@ -8,6 +8,8 @@ from stacky.utils.types import BranchName, CmdArgs, PathName, STACK_BOTTOMS
 
 # Global current branch - set by init_git()
 CURRENT_BRANCH: BranchName = BranchName("")
+# Cached `git rev-parse --show-toplevel` - set by init_git()
+TOP_LEVEL_DIR: Optional[PathName] = None
 
 
 def get_current_branch_name() -> BranchName:
@@ -25,6 +27,7 @@ def get_current_branch() -> Optional[BranchName]:
     """Get the current branch from git."""
     s = run(CmdArgs(["git", "symbolic-ref", "-q", "HEAD"]))
     if s is not None:
+        # --short would print "heads/<name>" when a tag shares the branch's name.
         return BranchName(remove_prefix(s, "refs/heads/"))
     return None
 
@@ -33,7 +36,8 @@ def get_all_branches() -> List[BranchName]:
     """Get all local branches."""
     branches = run_multiline(CmdArgs(["git", "for-each-ref", "--format", "%(refname:short)", "refs/heads"]))
     assert branches is not None
-    return [BranchName(b) for b in branches.split("\n") if b]
+    # BranchName is a NewType, so cast the whole list instead of wrapping each name.
+    return cast(List[BranchName], branches.splitlines())
 
 
 def branch_name_completer(prefix, parsed_args, **kwargs):
@@ -62,9 +66,9 @@ def get_stack_parent_branch(branch: BranchName) -> Optional[BranchName]:
     """Get the parent branch of a stack branch."""
     if branch in STACK_BOTTOMS:
         return None
-    p = run(CmdArgs(["git", "config", "branch.{}.merge".format(branch)]), check=False)
+    p = run(CmdArgs(["git", "config", f"branch.{branch}.merge"]), check=False)
     if p is not None:
-        p = remove_prefix(p, "refs/heads/")
+        p = p.removeprefix("refs/heads/")
         if BranchName(p) == branch:
             return None
         return BranchName(p)
@@ -73,6 +77,8 @@ def get_stack_parent_branch(branch: BranchName) -> Optional[BranchName]:
 
 def get_top_level_dir() -> PathName:
     """Get the top-level directory of the git repository."""
+    if TOP_LEVEL_DIR is not None:
+        return TOP_LEVEL_DIR
     p = run_always_return(CmdArgs(["git", "rev-parse", "--show-toplevel"]))
     return PathName(p)
 
@@ -110,6 +116,9 @@ def init_git(snapshot=None):
     if snapshot.current_branch is not None:
         global CURRENT_BRANCH
         CURRENT_BRANCH = snapshot.current_branch
+    if snapshot.top_level_dir is not None:
+        global TOP_LEVEL_DIR
+        TOP_LEVEL_DIR = snapshot.top_level_dir
     return snapshot
 
 
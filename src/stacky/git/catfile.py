@@ -0,0 +1,72 @@
+"""Long-lived `git cat-file --batch-check` coprocess for ref lookups.
+
+Resolving a ref with `git rev-parse` costs a fork+exec per call, which adds up
+on mutation paths (sync, fold, adopt) that re-read a handful of refs per
+branch. `git cat-file --batch-check` reads one object name per line on stdin
+and answers on stdout, so a single process can serve every lookup for the
+lifetime of the command. Ref files are re-read on every request, so updates
+made by other git commands in the meantime are visible.
+"""
+
+import atexit
+import subprocess
+import threading
+from typing import Optional
+
+from stacky.utils.logging import debug
+from stacky.utils.types import Commit
+
+
+class GitCatFileBatch:
+    """A `git cat-file --batch-check` coprocess that resolves refs to object names."""
+
+    def __init__(self):
+        debug("Starting git cat-file --batch-check")
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        self._lock = threading.Lock()
+
+    def resolve(self, ref: str) -> Optional[Commit]:
+        """Resolve a ref to its object name, or None if it doesn't exist."""
+        # A newline would split the request into two lookups and desync replies.
+        if not ref or "\n" in ref:
+            return None
+        with self._lock:
+            assert self._proc.stdin is not None and self._proc.stdout is not None
+            self._proc.stdin.write(ref + "\n")
+            self._proc.stdin.flush()
+            line = self._proc.stdout.readline()
+        # Missing refs come back as "<ref> missing" (or "ambiguous").
+        sha, _, obj_type = line.rstrip("\n").partition(" ")
+        if not obj_type or obj_type in ("missing", "ambiguous"):
+            return None
+        return Commit(sha)
+
+    def close(self):
+        """Shut down the coprocess."""
+        if self._proc.poll() is None:
+            assert self._proc.stdin is not None
+            self._proc.stdin.close()
+            self._proc.wait()
+
+
+_BATCH: Optional[GitCatFileBatch] = None
+
+
+def get_cat_file_batch() -> GitCatFileBatch:
+    """Get the shared coprocess, starting it on first use."""
+    global _BATCH
+    if _BATCH is None or _BATCH._proc.poll() is not None:
+        _BATCH = GitCatFileBatch()
+        atexit.register(_BATCH.close)
+    return _BATCH
+
+
+def resolve_ref(ref: str) -> Optional[Commit]:
+    """Resolve a ref to a commit using the shared coprocess."""
+    return get_cat_file_batch().resolve(ref)
@@ -1,7 +1,8 @@
 """Git ref operations for stacky."""
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
+from stacky.git.catfile import resolve_ref
 from stacky.utils.logging import die
 from stacky.utils.shell import run, run_multiline
 from stacky.utils.types import BranchName, CmdArgs, Commit
@@ -9,20 +10,14 @@ from stacky.utils.types import BranchName, CmdArgs, Commit
 
 def get_stack_parent_commit(branch: BranchName) -> Optional[Commit]:
     """Get the parent commit of a stack branch."""
-    c = run(
-        CmdArgs(["git", "rev-parse", "refs/stack-parent/{}".format(branch)]),
-        check=False,
-    )
-    if c is not None:
-        return Commit(c)
-    return None
+    return resolve_ref(f"refs/stack-parent/{branch}")
 
 
 def get_commit(branch: BranchName) -> Commit:
     """Get the current commit of a branch."""
-    c = run(CmdArgs(["git", "rev-parse", "refs/heads/{}".format(branch)]), check=False)
+    c = resolve_ref(f"refs/heads/{branch}")
     assert c is not None
-    return Commit(c)
+    return c
 
 
 def set_parent_commit(branch: BranchName, new_commit: Commit, prev_commit: Optional[str] = None):
@@ -30,7 +25,7 @@ def set_parent_commit(branch: BranchName, new_commit: Commit, prev_commit: Optio
     cmd = [
         "git",
         "update-ref",
-        "refs/stack-parent/{}".format(branch),
+        f"refs/stack-parent/{branch}",
         new_commit,
     ]
     if prev_commit is not None:
@@ -41,7 +36,7 @@ def set_parent_commit(branch: BranchName, new_commit: Commit, prev_commit: Optio
 def set_parent(branch: BranchName, target: Optional[BranchName], *, set_origin: bool = False):
     """Set the parent branch for a stack branch."""
     if set_origin:
-        run(CmdArgs(["git", "config", "branch.{}.remote".format(branch), "."]))
+        run(CmdArgs(["git", "config", f"branch.{branch}.remote", "."]))
 
     # If target is none this becomes a new stack bottom
     run(
@@ -49,8 +44,8 @@ def set_parent(branch: BranchName, target: Optional[BranchName], *, set_origin:
             [
                 "git",
                 "config",
-                "branch.{}.merge".format(branch),
-                "refs/heads/{}".format(target if target is not None else branch),
+                f"branch.{branch}.merge",
+                f"refs/heads/{target if target is not None else branch}",
             ]
         )
     )
@@ -62,17 +57,68 @@ def set_parent(branch: BranchName, target: Optional[BranchName], *, set_origin:
                     "git",
                     "update-ref",
                     "-d",
-                    "refs/stack-parent/{}".format(branch),
+                    f"refs/stack-parent/{branch}",
                 ]
             )
         )
 
 
+class UpdateRefTxn:
+    """Ref changes collected up front and applied in one `git update-ref --stdin` transaction.
+
+    Passing `old` to `update`/`delete`, or queueing a `verify`, makes the whole
+    transaction fail unless that ref still points at `old`.
+    """
+
+    def __init__(self) -> None:
+        self._lines: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def update(self, ref: str, new: str, old: Optional[str] = None) -> "UpdateRefTxn":
+        """Queue pointing `ref` at `new`."""
+        self._lines.append(f"update {ref} {new}" if old is None else f"update {ref} {new} {old}")
+        return self
+
+    def delete(self, ref: str, old: Optional[str] = None) -> "UpdateRefTxn":
+        """Queue deleting `ref`."""
+        self._lines.append(f"delete {ref}" if old is None else f"delete {ref} {old}")
+        return self
+
+    def verify(self, ref: str, old: str) -> "UpdateRefTxn":
+        """Queue a check that `ref` still points at `old`, without changing it."""
+        self._lines.append(f"verify {ref} {old}")
+        return self
+
+    def commit(self):
+        """Apply every queued change at once; a no-op if nothing is queued."""
+        if not self._lines:
+            return
+        lines, self._lines = self._lines, []
+        run(CmdArgs(["git", "update-ref", "--stdin"]), input="\n".join(lines) + "\n")
+
+
+def update_refs(updates: List[Tuple[str, Optional[str]]], *, old_values: Optional[Dict[str, str]] = None):
+    """Update (or, for a None value, delete) several refs in one `git update-ref --stdin` transaction.
+
+    Refs listed in `old_values` are only changed if they still point at that value.
+    """
+    old_values = old_values or {}
+    txn = UpdateRefTxn()
+    for ref, value in updates:
+        if value is None:
+            txn.delete(ref, old_values.get(ref))
+        else:
+            txn.update(ref, value, old_values.get(ref))
+    txn.commit()
+
+
 def get_branch_name_from_short_ref(ref: str) -> BranchName:
     """Extract branch name from a short ref like 'stack-parent/branch'."""
     parts = ref.split("/", 1)
     if len(parts) != 2:
-        die("invalid ref: {}".format(ref))
+        die("invalid ref: {}", ref)
     return BranchName(parts[1])
 
 
@@ -96,12 +142,17 @@ def get_all_stack_parent_refs() -> List[BranchName]:
 
 def get_commits_between(a: Commit, b: Commit) -> List[str]:
     """Get list of commits between two refs."""
-    lines = run_multiline(CmdArgs(["git", "rev-list", "{}..{}".format(a, b)]))
+    lines = run_multiline(CmdArgs(["git", "rev-list", f"{a}..{b}"]))
     assert lines is not None
     # Have to strip the last element because it's empty, rev list includes a new line at the end
     return [x.strip() for x in lines.split("\n")][:-1]
 
 
+def is_ancestor(a: Commit, b: Commit) -> bool:
+    """Check whether commit a is an ancestor of (or equal to) commit b."""
+    return run(CmdArgs(["git", "merge-base", "--is-ancestor", str(a), str(b)]), check=False) is not None
+
+
 def get_merge_base(b1: BranchName, b2: BranchName) -> Optional[str]:
     """Get the merge base of two branches."""
     return run(CmdArgs(["git", "merge-base", str(b1), str(b2)]))
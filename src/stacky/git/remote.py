@@ -1,11 +1,12 @@
 """Remote and SSH operations for stacky."""
 
+import functools
 import os
 import re
 import subprocess
-import time
 from typing import Optional, Tuple
 
+from stacky.git.catfile import resolve_ref
 from stacky.utils.config import get_config
 from stacky.utils.logging import die, error, info
 from stacky.utils.shell import run, run_always_return
@@ -28,30 +29,25 @@ def validate_local_remote(branch: BranchName, remote_config: Optional[str]):
 def get_remote_info(branch: BranchName) -> Tuple[str, BranchName, Optional[Commit]]:
     """Get remote info for a branch: (remote, remote_branch, remote_branch_commit)."""
     if branch not in STACK_BOTTOMS:
-        remote_config = run(CmdArgs(["git", "config", "branch.{}.remote".format(branch)]), check=False)
+        remote_config = run(CmdArgs(["git", "config", f"branch.{branch}.remote"]), check=False)
         validate_local_remote(branch, remote_config)
 
     # TODO(tudor): Maybe add a way to change these.
     remote = "origin"
     remote_branch = branch
 
-    remote_commit = run(
-        CmdArgs(["git", "rev-parse", "refs/remotes/{}/{}".format(remote, remote_branch)]),
-        check=False,
-    )
-
-    commit = None
-    if remote_commit is not None:
-        commit = Commit(remote_commit)
+    commit = resolve_ref(f"refs/remotes/{remote}/{remote_branch}")
 
     return (remote, BranchName(remote_branch), commit)
 
 
+@functools.lru_cache(maxsize=8)
 def get_remote_type(remote: str = "origin") -> Optional[str]:
-    """Get the SSH host type for a remote."""
+    """Get the SSH host type for a remote (cached; remotes don't change during a command)."""
     out = run_always_return(CmdArgs(["git", "remote", "-v"]))
+    pattern = re.compile(r"^" + re.escape(remote) + r"\s+(?:ssh://)?([^/]*):(?!//).*\s+\(push\)$")
     for l in out.split("\n"):
-        match = re.match(r"^{}\s+(?:ssh://)?([^/]*):(?!//).*\s+\(push\)$".format(remote), l)
+        match = pattern.match(l)
         if match:
             sshish_host = match.group(1)
             return sshish_host
@@ -84,15 +80,13 @@ def start_muxed_ssh(remote: str = "origin"):
         os.environ["GIT_SSH_COMMAND"] = " ".join(cmd)
         cmd.append("-MNf")
         cmd.append(hostish)
-        # We don't want to use the run() wrapper because
-        # we don't want to wait for the process to finish
+        # We don't want to use the run() wrapper because the backgrounded
+        # master keeps stderr open, so we can't wait for EOF on it.
 
         p = subprocess.Popen(cmd, stderr=subprocess.PIPE)
-        # Wait a little bit for the connection to establish
-        # before carrying on
-        while p.poll() is None:
-            time.sleep(1)
-        if p.returncode != 0:
+        # With -f, ssh forks into the background once the connection is
+        # established, so the foreground process exits as soon as it's usable.
+        if p.wait() != 0:
             if p.stderr is not None:
                 err = p.stderr.read()
             else:
@@ -3,10 +3,11 @@
 `stacky`'s stack-loading path used to shell out five times per local branch
 (one `git config` + four `git rev-parse`/`git config` calls inside
 `StackBranch.__init__`). On a checkout with many branches that startup cost
-dominated wall time. `GitSnapshot` collects all of the same data in three
+dominated wall time. `GitSnapshot` collects all of the same data in four
 parallel subprocess calls: `git for-each-ref` for the ref table,
 `git config --null --get-regexp` for the per-branch merge/remote config
-(plus `remote.pushDefault`), and `git symbolic-ref` for HEAD.
+(plus `remote.pushDefault`), `git symbolic-ref` for HEAD, and
+`git rev-parse --show-toplevel` for the repo-level config lookup.
 
 Callers that already have a snapshot should pass it down so the fine-grained
 helpers in `stacky.git.refs` / `stacky.git.branch` / `stacky.git.remote` don't
@@ -19,7 +20,7 @@ import dataclasses
 import subprocess
 from typing import Dict, Optional, Set, Tuple
 
-from stacky.utils.types import BranchName, Commit
+from stacky.utils.types import BranchName, Commit, PathName
 
 
 @dataclasses.dataclass
@@ -34,6 +35,7 @@ class GitSnapshot:
     remote_name: str
     push_default: Optional[str]
     current_branch: Optional[BranchName]
+    top_level_dir: Optional[PathName] = None
 
 
 ParsedRefs = Tuple[
@@ -61,13 +63,13 @@ def _parse_refs(out: Optional[str], remote_name: str) -> ParsedRefs:
         if not sha:
             continue
         if refname.startswith("refs/heads/"):
-            head_commit[BranchName(refname[len("refs/heads/"):])] = Commit(sha)
+            head_commit[BranchName(refname.removeprefix("refs/heads/"))] = Commit(sha)
         elif refname.startswith(remote_prefix):
-            remote_commit[BranchName(refname[len(remote_prefix):])] = Commit(sha)
+            remote_commit[BranchName(refname.removeprefix(remote_prefix))] = Commit(sha)
         elif refname.startswith("refs/stack-parent/"):
-            stack_parent_commit[BranchName(refname[len("refs/stack-parent/"):])] = Commit(sha)
+            stack_parent_commit[BranchName(refname.removeprefix("refs/stack-parent/"))] = Commit(sha)
         elif refname.startswith("refs/stacky-bottom-branch/"):
-            bottoms.add(BranchName(refname[len("refs/stacky-bottom-branch/"):]))
+            bottoms.add(BranchName(refname.removeprefix("refs/stacky-bottom-branch/")))
     return head_commit, remote_commit, stack_parent_commit, bottoms
 
 
@@ -93,21 +95,19 @@ def _parse_null_config(out: Optional[str]) -> ParsedConfig:
             continue
         if not key.startswith("branch."):
             continue
-        rest = key[len("branch."):]
+        rest = key.removeprefix("branch.")
         name, _, field = rest.rpartition(".")
         if not name:
             continue
         if field == "merge":
-            if value.startswith("refs/heads/"):
-                value = value[len("refs/heads/"):]
-            branch_merge[BranchName(name)] = BranchName(value)
+            branch_merge[BranchName(name)] = BranchName(value.removeprefix("refs/heads/"))
         elif field == "remote":
             branch_remote[BranchName(name)] = value
     return branch_merge, branch_remote, push_default
 
 
 def load_snapshot(remote_name: str = "origin") -> GitSnapshot:
-    """Collect every ref + branch-config stacky needs, in three parallel subprocesses."""
+    """Collect every ref + branch-config stacky needs, in four parallel subprocesses."""
     p_refs = subprocess.Popen(
         [
             "git", "for-each-ref",
@@ -130,10 +130,15 @@ def load_snapshot(remote_name: str = "origin") -> GitSnapshot:
         ["git", "symbolic-ref", "-q", "HEAD"],
         stdout=subprocess.PIPE, stderr=subprocess.PIPE,
     )
+    p_toplevel = subprocess.Popen(
+        ["git", "rev-parse", "--show-toplevel"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
 
     refs_bytes, _ = p_refs.communicate()
     config_bytes, _ = p_config.communicate()
     head_bytes, _ = p_head.communicate()
+    toplevel_bytes, _ = p_toplevel.communicate()
 
     refs_out = refs_bytes.decode("UTF-8")
     # `git config --get-regexp` returns rc=1 when no keys match; that's "no
@@ -141,13 +146,14 @@ def load_snapshot(remote_name: str = "origin") -> GitSnapshot:
     config_out = config_bytes.decode("UTF-8") if p_config.returncode in (0, 1) else ""
     # `git symbolic-ref -q` returns rc=1 on detached HEAD; treat as "no branch".
     head_out = head_bytes.decode("UTF-8").strip() if p_head.returncode == 0 else ""
+    top_level_dir = PathName(toplevel_bytes.decode("UTF-8").strip()) if p_toplevel.returncode == 0 else None
 
     head_commit, remote_commit, stack_parent_commit, bottoms = _parse_refs(refs_out, remote_name)
     branch_merge, branch_remote, push_default = _parse_null_config(config_out)
 
     current_branch: Optional[BranchName] = None
     if head_out.startswith("refs/heads/"):
-        current_branch = BranchName(head_out[len("refs/heads/"):])
+        current_branch = BranchName(head_out.removeprefix("refs/heads/"))
 
     return GitSnapshot(
         head_commit=head_commit,
@@ -159,4 +165,5 @@ def load_snapshot(remote_name: str = "origin") -> GitSnapshot:
         remote_name=remote_name,
         push_default=push_default,
         current_branch=current_branch,
+        top_level_dir=top_level_dir,
     )
@@ -4,9 +4,8 @@ import json
 import logging
 import os
 import sys
-from argparse import ArgumentParser
-
-import argcomplete  # type: ignore
+from argparse import ArgumentError, ArgumentParser
+from typing import Callable, Dict, List
 
 from stacky.git.branch import (
     branch_name_completer, check_gh_auth, get_current_branch_name,
@@ -20,7 +19,7 @@ from stacky.utils.logging import (
     ExitException, _LOGGING_FORMAT, error, set_color_mode
 )
 from stacky.utils.shell import run
-from stacky.utils.types import BranchName, LOGLEVELS, STATE_FILE
+from stacky.utils.types import BranchName, CmdArgs, LOGLEVELS, STATE_FILE
 
 # Import all command handlers
 from stacky.commands.navigation import cmd_info, cmd_log, cmd_branch_up, cmd_branch_down
@@ -44,62 +43,12 @@ def main():
     logging.basicConfig(format=_LOGGING_FORMAT, level=logging.INFO)
     try:
         parser = ArgumentParser(description="Handle git stacks")
-        parser.add_argument(
-            "--log-level", default="info", choices=LOGLEVELS.keys(),
-            help="Set the log level",
-        )
-        parser.add_argument(
-            "--color", default="auto", choices=["always", "auto", "never"],
-            help="Colorize output and error",
-        )
-        parser.add_argument(
-            "--remote-name", "-r", default="origin",
-            help="name of the git remote where branches will be pushed",
-        )
-
+        _add_global_arguments(parser)
         subparsers = parser.add_subparsers(required=True, dest="command")
+        for setup in _select_command_setups(sys.argv[1:]):
+            setup(subparsers)
 
-        # continue
-        continue_parser = subparsers.add_parser("continue", help="Continue previously interrupted command")
-        continue_parser.set_defaults(func=None)
-
-        # down / up
-        down_parser = subparsers.add_parser("down", help="Go down in the current stack (towards master/main)")
-        down_parser.set_defaults(func=cmd_branch_down)
-        up_parser = subparsers.add_parser("up", help="Go up in the current stack (away master/main)")
-        up_parser.set_defaults(func=cmd_branch_up)
-
-        # info
-        info_parser = subparsers.add_parser("info", help="Stack info")
-        info_parser.add_argument("--pr", action="store_true", help="Get PR info (slow)")
-        info_parser.set_defaults(func=cmd_info)
-
-        # log
-        log_parser = subparsers.add_parser("log", help="Show git log with conditional merge handling")
-        log_parser.set_defaults(func=cmd_log)
-
-        # commit
-        commit_parser = subparsers.add_parser("commit", help="Commit")
-        commit_parser.add_argument("-m", help="Commit message", dest="message")
-        commit_parser.add_argument("--amend", action="store_true", help="Amend last commit")
-        commit_parser.add_argument("--allow-empty", action="store_true", help="Allow empty commit")
-        commit_parser.add_argument("--no-edit", action="store_true", help="Skip editor")
-        commit_parser.add_argument("-a", action="store_true", help="Add all files to commit", dest="add_all")
-        commit_parser.add_argument("--no-verify", action="store_true", help="Bypass pre-commit and commit-msg hooks")
-        commit_parser.set_defaults(func=cmd_commit)
-
-        # amend
-        amend_parser = subparsers.add_parser("amend", help="Shortcut for amending last commit")
-        amend_parser.add_argument("--no-verify", action="store_true", help="Bypass pre-commit and commit-msg hooks")
-        amend_parser.set_defaults(func=cmd_amend)
-
-        _setup_branch_subcommands(subparsers)
-        _setup_stack_subcommands(subparsers)
-        _setup_upstack_subcommands(subparsers)
-        _setup_downstack_subcommands(subparsers)
-        _setup_other_commands(subparsers)
-
-        argcomplete.autocomplete(parser)
+        _autocomplete(parser)
         args = parser.parse_args()
         logging.basicConfig(format=_LOGGING_FORMAT, level=LOGLEVELS[args.log_level], force=True)
         set_color_mode(args.color)
@@ -112,21 +61,7 @@ def main():
         stack = StackBranchSet()
         load_all_stacks(stack, snapshot)
 
-        current_branch = get_current_branch_name()
-        if args.command == "continue":
-            _handle_continue(stack, current_branch)
-        else:
-            if current_branch not in stack.stack:
-                main_branch = get_real_stack_bottom()
-                if get_config().change_to_main and main_branch is not None:
-                    run(["git", "checkout", main_branch])
-                    set_current_branch(main_branch)
-                else:
-                    from stacky.utils.logging import die
-                    die("Current branch {} is not in a stack", current_branch)
-
-            get_current_stack_as_forest(stack)
-            args.func(stack, args)
+        _dispatch(stack, args)
 
         # Success, delete the state file
         try:
@@ -138,6 +73,33 @@ def main():
         sys.exit(1)
 
 
+def _autocomplete(parser: ArgumentParser):
+    """Answer a shell completion request, if this is one."""
+    if "_ARGCOMPLETE" in os.environ:
+        # Only shell completion needs argcomplete; skip importing it otherwise.
+        import argcomplete  # type: ignore
+        argcomplete.autocomplete(parser)
+
+
+def _dispatch(stack: StackBranchSet, args):
+    """Run the selected command, or resume an interrupted one for 'continue'."""
+    current_branch = get_current_branch_name()
+    if args.command == "continue":
+        _handle_continue(stack, current_branch)
+        return
+    if current_branch not in stack.stack:
+        main_branch = get_real_stack_bottom()
+        if get_config().change_to_main and main_branch is not None:
+            run(CmdArgs(["git", "checkout", main_branch]))
+            set_current_branch(main_branch)
+        else:
+            from stacky.utils.logging import die
+            die("Current branch {} is not in a stack", current_branch)
+
+    get_current_stack_as_forest(stack)
+    args.func(stack, args)
+
+
 def _needs_gh(args) -> bool:
     """Whether this invocation will shell out to `gh`.
 
@@ -177,7 +139,8 @@ def _handle_continue(stack: StackBranchSet, current_branch: BranchName):
             fold_state["parent_branch"],
             fold_state["commits"],
             fold_state["children"],
-            fold_state["allow_empty"]
+            fold_state["allow_empty"],
+            fold_state.get("onto"),
         )
     elif "merge_fold" in state:
         merge_fold_state = state["merge_fold"]
@@ -191,6 +154,88 @@ def _handle_continue(stack: StackBranchSet, current_branch: BranchName):
         die("Unknown operation in progress")
 
 
+def _add_global_arguments(parser: ArgumentParser):
+    """Add the options accepted before the subcommand."""
+    parser.add_argument(
+        "--log-level", default="info", choices=LOGLEVELS.keys(),
+        help="Set the log level",
+    )
+    parser.add_argument(
+        "--color", default="auto", choices=["always", "auto", "never"],
+        help="Colorize output and error",
+    )
+    parser.add_argument(
+        "--remote-name", "-r", default="origin",
+        help="name of the git remote where branches will be pushed",
+    )
+
+
+def _select_command_setups(argv: List[str]) -> List[Callable]:
+    """Pick the subparser setup functions needed to parse `argv`.
+
+    Only the invoked command's group is built; shell completion, top-level help
+    and unknown commands fall back to building every subparser.
+    """
+    if "_ARGCOMPLETE" in os.environ:
+        return _ALL_COMMAND_SETUPS
+    # Skip over the global options (and their values) without validating them.
+    pre = ArgumentParser(add_help=False, exit_on_error=False)
+    pre.add_argument("--log-level")
+    pre.add_argument("--color")
+    pre.add_argument("--remote-name", "-r")
+    try:
+        _, rest = pre.parse_known_args(argv)
+    except ArgumentError:
+        # Let the full parser report the problem.
+        return _ALL_COMMAND_SETUPS
+    for arg in rest:
+        if arg in ("-h", "--help"):
+            break
+        if not arg.startswith("-"):
+            setup = _COMMAND_SETUPS.get(arg)
+            if setup is not None:
+                return [setup]
+            break
+    return _ALL_COMMAND_SETUPS
+
+
+def _setup_core_commands(subparsers):
+    """Setup core commands (continue, navigation, info, log, commit)."""
+    # continue
+    continue_parser = subparsers.add_parser("continue", help="Continue previously interrupted command")
+    continue_parser.set_defaults(func=None)
+
+    # down / up
+    down_parser = subparsers.add_parser("down", help="Go down in the current stack (towards master/main)")
+    down_parser.set_defaults(func=cmd_branch_down)
+    up_parser = subparsers.add_parser("up", help="Go up in the current stack (away master/main)")
+    up_parser.set_defaults(func=cmd_branch_up)
+
+    # info
+    info_parser = subparsers.add_parser("info", help="Stack info")
+    info_parser.add_argument("--pr", action="store_true", help="Get PR info (slow)")
+    info_parser.set_defaults(func=cmd_info)
+
+    # log
+    log_parser = subparsers.add_parser("log", help="Show git log with conditional merge handling")
+    log_parser.set_defaults(func=cmd_log)
+
+    # commit
+    commit_parser = subparsers.add_parser("commit", help="Commit")
+    commit_parser.add_argument("-m", help="Commit message", dest="message")
+    commit_parser.add_argument("--amend", action="store_true", help="Amend last commit")
+    commit_parser.add_argument("--allow-empty", action="store_true", help="Allow empty commit")
+    commit_parser.add_argument("--no-edit", action="store_true", help="Skip editor")
+    commit_parser.add_argument("-a", action="store_true", help="Add all files to commit", dest="add_all")
+    commit_parser.add_argument("--no-verify", action="store_true", help="Bypass pre-commit and commit-msg hooks")
+    commit_parser.set_defaults(func=cmd_commit)
+
+    # amend
+    amend_parser = subparsers.add_parser("amend", help="Shortcut for amending last commit")
+    amend_parser.add_argument("--no-verify", action="store_true", help="Bypass pre-commit and commit-msg hooks")
+    amend_parser.set_defaults(func=cmd_amend)
+
+
 def _setup_branch_subcommands(subparsers):
     """Setup branch subcommands."""
     branch_parser = subparsers.add_parser("branch", aliases=["b"], help="Operations on branches")
@@ -336,3 +381,29 @@ def _setup_other_commands(subparsers):
     fold_parser = subparsers.add_parser("fold", help="Fold current branch into parent branch and delete current branch")
     fold_parser.add_argument("--allow-empty", action="store_true", help="Allow empty commits during cherry-pick")
     fold_parser.set_defaults(func=cmd_fold)
+
+
+_ALL_COMMAND_SETUPS: List[Callable] = [
+    _setup_core_commands,
+    _setup_branch_subcommands,
+    _setup_stack_subcommands,
+    _setup_upstack_subcommands,
+    _setup_downstack_subcommands,
+    _setup_other_commands,
+]
+
+# Top-level command names and aliases, mapped to the function that sets them up.
+_COMMAND_SETUPS: Dict[str, Callable] = {
+    **dict.fromkeys(["continue", "down", "up", "info", "log", "commit", "amend"], _setup_core_commands),
+    **dict.fromkeys(["branch", "b"], _setup_branch_subcommands),
+    **dict.fromkeys(["stack", "s"], _setup_stack_subcommands),
+    **dict.fromkeys(["upstack", "us"], _setup_upstack_subcommands),
+    **dict.fromkeys(["downstack", "ds"], _setup_downstack_subcommands),
+    **dict.fromkeys(
+        [
+            "update", "import", "adopt", "land", "push", "sync", "checkout", "co",
+            "sco", "inbox", "prs", "fold",
+        ],
+        _setup_other_commands,
+    ),
+}
@@ -0,0 +1,64 @@
+"""Short-lived on-disk cache for `gh` query output."""
+
+import hashlib
+import os
+import tempfile
+import time
+from typing import List
+
+from stacky.git.branch import get_top_level_dir
+from stacky.utils.logging import debug
+from stacky.utils.shell import run_bytes
+from stacky.utils.types import CACHE_DIR, CmdArgs
+
+DEFAULT_TTL = 30  # seconds
+
+
+def _cache_path(key: str, argv: List[str]) -> str:
+    """Path of the cache entry for a query, scoped to the current repository."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in (get_top_level_dir(), key, *argv):
+        h.update(part.encode("UTF-8"))
+        h.update(b"\0")
+    return os.path.join(CACHE_DIR, f"{h.hexdigest()}.json")
+
+
+def cached_gh(key: str, argv: List[str], ttl: int = DEFAULT_TTL) -> bytes:
+    """Run a read-only `gh` query, reusing output younger than `ttl` seconds.
+
+    Output is kept as bytes, since `json.loads` takes them without a separate decode.
+    """
+    path = _cache_path(key, argv)
+    try:
+        if time.time() - os.stat(path).st_mtime < ttl:
+            with open(path, "rb") as f:
+                debug("Using cached output for {}", key)
+                return f.read()
+    except OSError:
+        pass
+
+    out = run_bytes(CmdArgs(argv))
+    assert out is not None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(out)
+        os.replace(tmp, path)
+    except OSError as e:
+        debug("Failed to write cache for {}: {}", key, e)
+    return out
+
+
+def clear_gh_cache():
+    """Drop all cached `gh` output, e.g. after editing a PR."""
+    try:
+        names = os.listdir(CACHE_DIR)
+    except OSError:
+        return
+    for name in names:
+        if name.endswith(".json"):
+            try:
+                os.unlink(os.path.join(CACHE_DIR, name))
+            except OSError:
+                pass
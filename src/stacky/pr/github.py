@@ -5,28 +5,38 @@ import logging
 import os
 import re
 import subprocess
+import sys
 import tempfile
-from typing import Dict, List, Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 
+from stacky.pr.cache import clear_gh_cache
 from stacky.stack.models import PRInfo, PRInfos
 from stacky.stack.tree import get_pr_status_emoji
 from stacky.utils.config import get_config
 from stacky.utils.logging import COLOR_STDOUT, cout, fmt
-from stacky.utils.shell import run, run_always_return, run_multiline
+from stacky.utils.shell import run, run_always_return, run_multiline, run_parallel
 from stacky.utils.types import BranchesTreeForest, BranchName, CmdArgs, STACK_BOTTOMS
 
 if TYPE_CHECKING:
     from stacky.stack.models import StackBranch
 
+# First "Reviewer(s): a, b" line of a commit body; [ \t] so the match can't run onto the next line.
+_REVIEWERS_RE = re.compile(r"^reviewers?[ \t]*:[ \t]*(.*)", re.I | re.M)
+_ISSUE_MARKER_RE = re.compile(r"(?:^|[_-])([A-Z]{3,})[_-]?(\d{2,})(?:$|[_-])")
+_STACK_COMMENT_START = "<!-- Stacky Stack Info -->"
+_STACK_COMMENT_END = "<!-- End Stacky Stack Info -->"
 
-def get_pr_info(branch: BranchName, *, full: bool = False) -> PRInfos:
-    """Get PR information for a branch."""
+
+def get_pr_info(branch: BranchName, *, full: bool = False, minimal: bool = False) -> PRInfos:
+    """Get PR information for a branch.
+
+    `minimal` fetches only what's needed to decide whether a PR can be merged.
+    """
     from stacky.utils.logging import die
 
-    fields = [
-        "id", "number", "state", "mergeable", "url", "title",
-        "baseRefName", "headRefName", "reviewDecision", "reviewRequests", "isDraft",
-    ]
+    fields = ["id", "number", "state", "mergeable", "url"]
+    if not minimal:
+        fields += ["title", "baseRefName", "headRefName", "reviewDecision", "reviewRequests", "isDraft"]
     if full:
         fields += ["commits"]
     data = json.loads(
@@ -55,27 +65,19 @@ def find_reviewers(b: "StackBranch") -> Optional[List[str]]:
         CmdArgs(["git", "log", "--pretty=format:%b", "-1", f"{b.name}"]),
     )
     assert out is not None
-    for l in out.split("\n"):
-        reviewer_match = re.match(r"^reviewers?\s*:\s*(.*)", l, re.I)
-        if reviewer_match:
-            reviewers = reviewer_match.group(1).split(",")
-            logging.debug(f"Found the following reviewers: {', '.join(reviewers)}")
-            return reviewers
+    reviewer_match = _REVIEWERS_RE.search(out)
+    if reviewer_match:
+        reviewers = [r.strip() for r in reviewer_match.group(1).split(",") if r.strip()]
+        logging.debug(f"Found the following reviewers: {', '.join(reviewers)}")
+        return reviewers
     return None
 
 
 def find_issue_marker(name: str) -> Optional[str]:
     """Find issue marker (e.g. SRE-123) in branch name."""
-    match = re.search(r"(?:^|[_-])([A-Z]{3,}[_-]?\d{2,})($|[_-].*)", name)
+    match = _ISSUE_MARKER_RE.search(name)
     if match:
-        res = match.group(1)
-        if "_" in res:
-            return res.replace("_", "-")
-        if "-" not in res:
-            newmatch = re.match(r"(...)(\d+)", res)
-            assert newmatch is not None
-            return f"{newmatch.group(1)}-{newmatch.group(2)}"
-        return res
+        return f"{match.group(1)}-{match.group(2)}"
     return None
 
 
@@ -128,86 +130,158 @@ def create_gh_pr(b: "StackBranch", prefix: str):
     run(CmdArgs(cmd), out=True)
 
 
-def generate_stack_string(forest: BranchesTreeForest, current_branch: "StackBranch") -> str:
-    """Generate a string representation of the PR stack."""
-    from stacky.stack.tree import BranchesTree
-
-    stack_lines = []
+StackLines = List[Tuple["StackBranch", str]]
 
-    def add_branch_to_stack(b: "StackBranch", depth: int):
-        if b.name in STACK_BOTTOMS:
-            return
-        indent = "  " * depth
-        pr_info = ""
-        if b.open_pr_info:
-            pr_number = b.open_pr_info['number']
-            status_emoji = get_pr_status_emoji(b.open_pr_info)
-            pr_info = f" (#{pr_number}{status_emoji})"
-        current_indicator = " ← (CURRENT PR)" if b.name == current_branch.name else ""
-        stack_lines.append(f"{indent}- {b.name}{pr_info}{current_indicator}")
-
-    def traverse_tree(tree: BranchesTree, depth: int):
-        for _, (branch, children) in tree.items():
-            add_branch_to_stack(branch, depth)
-            traverse_tree(children, depth + 1)
 
+def build_stack_lines(forest: BranchesTreeForest) -> StackLines:
+    """Build the per-branch lines of the stack comment, without the current-PR marker."""
+    stack_lines: StackLines = []
     for tree in forest:
-        traverse_tree(tree, 0)
-
+        # Explicit stack of (children iterator, depth) frames; visits branches in pre-order.
+        frames = [(iter(tree.values()), 0)]
+        while frames:
+            it, depth = frames[-1]
+            item = next(it, None)
+            if item is None:
+                frames.pop()
+                continue
+            b, children = item
+            frames.append((iter(children.values()), depth + 1))
+            if b.name in STACK_BOTTOMS:
+                continue
+            pr_info = ""
+            if b.open_pr_info:
+                pr_info = f" (#{b.open_pr_info['number']}{get_pr_status_emoji(b.open_pr_info)})"
+            stack_lines.append((b, f"{'  ' * depth}- {b.name}{pr_info}"))
+
+    return stack_lines
+
+
+def render_stack_string(stack_lines: StackLines, current_branch: "StackBranch") -> str:
+    """Render lines from build_stack_lines, marking the current branch's row."""
     if not stack_lines:
         return ""
 
     return "\n".join([
-        "<!-- Stacky Stack Info -->",
+        _STACK_COMMENT_START,
         "**Stack:**",
-        *stack_lines,
-        "<!-- End Stacky Stack Info -->"
+        *(f"{line} ← (CURRENT PR)" if b.name == current_branch.name else line for b, line in stack_lines),
+        _STACK_COMMENT_END,
     ])
 
 
+def generate_stack_string(forest: BranchesTreeForest, current_branch: "StackBranch") -> str:
+    """Generate a string representation of the PR stack."""
+    return render_stack_string(build_stack_lines(forest), current_branch)
+
+
+def find_stack_comment(body: str) -> Optional[Tuple[int, int]]:
+    """Find the (start, end) span of the existing stack comment in a PR body."""
+    if not body:
+        return None
+    start = body.find(_STACK_COMMENT_START)
+    if start == -1:
+        return None
+    end = body.find(_STACK_COMMENT_END, start + len(_STACK_COMMENT_START))
+    if end == -1:
+        return None
+    return start, end + len(_STACK_COMMENT_END)
+
+
 def extract_stack_comment(body: str) -> str:
     """Extract existing stack comment from PR body."""
-    if not body:
+    span = find_stack_comment(body)
+    if span is None:
         return ""
-    pattern = r'<!-- Stacky Stack Info -->.*?<!-- End Stacky Stack Info -->'
-    match = re.search(pattern, body, re.DOTALL)
-    if match:
-        return match.group(0).strip()
-    return ""
+    return body[span[0]:span[1]]
 
 
-def add_or_update_stack_comment(branch: "StackBranch", complete_forest: BranchesTreeForest):
-    """Add or update stack comment in PR body."""
-    if not branch.open_pr_info:
-        return
+def query_repository(fields: str) -> dict:
+    """Run a GraphQL query against the current repository and return its `repository` object."""
+    query = (
+        "query($owner: String!, $name: String!) "
+        f"{{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+    )
+    data = json.loads(
+        run_always_return(
+            CmdArgs([
+                "gh", "api", "graphql",
+                "-F", "owner={owner}", "-F", "name={repo}",
+                "-f", f"query={query}",
+            ])
+        )
+    )
+    return data["data"]["repository"]
 
-    pr_number = branch.open_pr_info["number"]
-    pr_data = json.loads(
-        run_always_return(CmdArgs(["gh", "pr", "view", str(pr_number), "--json", "body"]))
+
+def fetch_pr_bodies(pr_numbers: List[int]) -> Dict[int, str]:
+    """Fetch the bodies of several PRs with a single GraphQL request."""
+    if not pr_numbers:
+        return {}
+    # One aliased field per PR, so N bodies cost one API round-trip instead of N.
+    repository = query_repository(" ".join(f"pr{n}: pullRequest(number: {n}) {{ body }}" for n in pr_numbers))
+    return {n: (repository.get(f"pr{n}") or {}).get("body") or "" for n in pr_numbers}
+
+
+def fetch_open_prs_by_head() -> Dict[str, List[PRInfo]]:
+    """Fetch up to 100 open PRs, keyed by head branch, with a single GraphQL request.
+
+    Each entry has the number, head/base names and first commit, in the same
+    shape `get_pr_info(full=True)` returns them.
+    """
+    repository = query_repository(
+        "pullRequests(states: OPEN, first: 100) { nodes { "
+        "number headRefName baseRefName commits(first: 1) { nodes { commit { oid } } } } }"
     )
+    prs: Dict[str, List[PRInfo]] = {}
+    for node in repository["pullRequests"]["nodes"]:
+        pr = {
+            "number": node["number"],
+            "headRefName": node["headRefName"],
+            "baseRefName": node["baseRefName"],
+            "commits": [{"oid": c["commit"]["oid"]} for c in node["commits"]["nodes"]],
+        }
+        prs.setdefault(node["headRefName"], []).append(pr)  # type: ignore[arg-type]
+    return prs
+
+
+def get_stack_comment_edit(
+    branch: "StackBranch", stack_lines: StackLines, bodies: Dict[int, str]
+) -> Optional[CmdArgs]:
+    """Get the `gh pr edit` command that adds or updates the stack comment, if one is needed."""
+    if not branch.open_pr_info:
+        return None
 
-    current_body = pr_data.get("body", "")
-    stack_string = generate_stack_string(complete_forest, branch)
+    pr_number = branch.open_pr_info["number"]
+    current_body = bodies.get(pr_number, "")
+    stack_string = render_stack_string(stack_lines, branch)
 
     if not stack_string:
-        return
+        return None
 
-    existing_stack = extract_stack_comment(current_body)
+    span = find_stack_comment(current_body)
 
-    if not existing_stack:
+    if span is None:
         if current_body:
             new_body = f"{current_body}\n\n{stack_string}"
         else:
             new_body = stack_string
         cout("Adding stack comment to PR #{}\n", pr_number, fg="green")
-        run(CmdArgs(["gh", "pr", "edit", str(pr_number), "--body", new_body]), out=True)
-    else:
-        if existing_stack != stack_string:
-            updated_body = current_body.replace(existing_stack, stack_string)
-            cout("Updating stack comment in PR #{}\n", pr_number, fg="yellow")
-            run(CmdArgs(["gh", "pr", "edit", str(pr_number), "--body", updated_body]), out=True)
-        else:
-            cout("✓ Stack comment in PR #{} is already correct\n", pr_number, fg="green")
+        return CmdArgs(["gh", "pr", "edit", str(pr_number), "--body", new_body])
+    start, end = span
+    if current_body[start:end] != stack_string:
+        updated_body = current_body[:start] + stack_string + current_body[end:]
+        cout("Updating stack comment in PR #{}\n", pr_number, fg="yellow")
+        return CmdArgs(["gh", "pr", "edit", str(pr_number), "--body", updated_body])
+    cout("✓ Stack comment in PR #{} is already correct\n", pr_number, fg="green")
+    return None
+
+
+def run_pr_edits(cmds: List[CmdArgs]):
+    """Run independent `gh pr edit` commands concurrently, printing their output in order."""
+    for out in run_parallel(cmds):
+        if out:
+            sys.stdout.write(out)
 
 
 def edit_pr_description(pr):
@@ -225,12 +299,19 @@ def edit_pr_description(pr):
         temp_file_path = temp_file.name
 
     try:
+        before = os.stat(temp_file_path)
         editor = os.environ.get('EDITOR', 'vim')
         result = subprocess.run([editor, temp_file_path])
         if result.returncode != 0:
             cout("Editor exited with error, not updating PR description.\n", fg="red")
             return
 
+        # If the editor never wrote the file, there is nothing to read back or compare.
+        after = os.stat(temp_file_path)
+        if (after.st_mtime_ns, after.st_size) == (before.st_mtime_ns, before.st_size):
+            cout("No changes made to PR description.\n", fg="yellow")
+            return
+
         with open(temp_file_path, 'r') as temp_file:
             new_body = temp_file.read().strip()
 
@@ -245,6 +326,7 @@ def edit_pr_description(pr):
         run(CmdArgs(["gh", "pr", "edit", str(pr["number"]), "--body", new_body]), out=True)
         cout("✓ Successfully updated PR #{} description\n", pr["number"], fg="green")
         pr["body"] = new_body
+        clear_gh_cache()
 
     except Exception as e:
         cout("Error editing PR description: {}\n", str(e), fg="red")
@@ -41,6 +41,13 @@ class BranchNCommit:
 class StackBranch:
     """Represents a branch in a stack."""
 
+    # Stack walks read these attributes on every branch; slots keep that off the instance dict.
+    __slots__ = (
+        "name", "parent", "parent_commit", "children", "commit",
+        "remote", "remote_branch", "remote_commit",
+        "pr_info", "open_pr_info", "_pr_info_loaded",
+    )
+
     def __init__(
         self,
         name: BranchName,
@@ -53,7 +60,7 @@ class StackBranch:
         self.name = name
         self.parent = parent
         self.parent_commit = parent_commit
-        self.children: set["StackBranch"] = set()
+        self.children: Dict[BranchName, "StackBranch"] = {}
         self.commit = commit if commit is not None else get_commit(name)
         if remote_info is None:
             remote_info = get_remote_info(name)
@@ -73,12 +80,15 @@ class StackBranch:
     def __repr__(self):
         return f"StackBranch: {self.name} {len(self.children)} {self.commit}"
 
-    def load_pr_info(self):
-        """Load PR info from GitHub (lazy loading)."""
+    def load_pr_info(self, *, minimal: bool = False):
+        """Load PR info from GitHub (lazy loading).
+
+        A `minimal` load doesn't count as loaded, so a later full load still fetches.
+        """
         if not self._pr_info_loaded:
-            self._pr_info_loaded = True
+            self._pr_info_loaded = not minimal
             from stacky.pr.github import get_pr_info
-            pr_infos = get_pr_info(self.name)
+            pr_infos = get_pr_info(self.name, minimal=minimal)
             self.pr_info, self.open_pr_info = (
                 pr_infos.all,
                 pr_infos.open,
@@ -90,8 +100,9 @@ class StackBranchSet:
 
     def __init__(self: "StackBranchSet"):
         self.stack: Dict[BranchName, StackBranch] = {}
-        self.tops: set[StackBranch] = set()
-        self.bottoms: set[StackBranch] = set()
+        # Keyed by name, like `stack`, so iteration follows load order rather than object ids.
+        self.tops: Dict[BranchName, StackBranch] = {}
+        self.bottoms: Dict[BranchName, StackBranch] = {}
 
     def add(
         self,
@@ -119,8 +130,8 @@ class StackBranchSet:
         )
         self.stack[name] = s
         if s.parent is None:
-            self.bottoms.add(s)
-        self.tops.add(s)
+            self.bottoms[name] = s
+        self.tops[name] = s
         return s
 
     def addStackBranch(self, s: StackBranch):
@@ -128,9 +139,9 @@ class StackBranchSet:
         if s.name not in self.stack:
             self.stack[s.name] = s
             if s.parent is None:
-                self.bottoms.add(s)
+                self.bottoms[s.name] = s
             if len(s.children) == 0:
-                self.tops.add(s)
+                self.tops[s.name] = s
         return s
 
     def remove(self, name: BranchName) -> Optional[StackBranch]:
@@ -139,10 +150,8 @@ class StackBranchSet:
             s = self.stack[name]
             assert s.name == name
             del self.stack[name]
-            if s in self.tops:
-                self.tops.remove(s)
-            if s in self.bottoms:
-                self.bottoms.remove(s)
+            self.tops.pop(name, None)
+            self.bottoms.pop(name, None)
             return s
         return None
 
@@ -150,6 +159,17 @@ class StackBranchSet:
         return f"StackBranchSet: {self.stack}"
 
     def add_child(self, s: StackBranch, child: StackBranch):
-        """Add a child branch to a parent."""
-        s.children.add(child)
-        self.tops.discard(s)
+        """Add a child branch to a parent, keeping children ordered by name."""
+        last = next(reversed(s.children), None)
+        s.children[child.name] = child
+        if last is not None and child.name < last:
+            s.children = dict(sorted(s.children.items()))
+        self.tops.pop(s.name, None)
+
+    def add_children(self, s: StackBranch, children: List[StackBranch]):
+        """Add several children to a parent at once, re-sorting at most once."""
+        if not children:
+            return
+        s.children.update((child.name, child) for child in children)
+        s.children = dict(sorted(s.children.items()))
+        self.tops.pop(s.name, None)
@@ -1,15 +1,14 @@
 """Stack operations for stacky - loading, syncing, pushing."""
 
-import json
-import os
-from typing import List, Optional, Tuple, TYPE_CHECKING
+import functools
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 
 from stacky.git.branch import (
-    get_all_branches, get_current_branch_name, get_stack_parent_branch, set_current_branch
+    get_current_branch_name, get_stack_parent_branch, set_current_branch
 )
 from stacky.git.refs import (
-    get_all_stack_bottoms, get_commit, get_commits_between,
-    get_stack_parent_commit, set_parent_commit
+    get_all_stack_bottoms, get_commit, get_stack_parent_commit,
+    is_ancestor, set_parent_commit, update_refs
 )
 from stacky.git.remote import start_muxed_ssh, stop_muxed_ssh, validate_local_remote
 from stacky.git.snapshot import GitSnapshot, load_snapshot
@@ -20,11 +19,9 @@ from stacky.stack.tree import (
 )
 from stacky.utils.config import get_config
 from stacky.utils.logging import cout, die, info, warning
-from stacky.utils.shell import run, run_always_return
-from stacky.utils.types import (
-    BranchesTreeForest, BranchName, CmdArgs, Commit,
-    STACK_BOTTOMS, STATE_FILE, TMP_STATE_FILE
-)
+from stacky.utils.shell import run, run_always_return, run_multiline
+from stacky.utils.state import save_state
+from stacky.utils.types import BranchesTreeForest, BranchName, CmdArgs, Commit, STACK_BOTTOMS
 
 if TYPE_CHECKING:
     pass
@@ -123,16 +120,16 @@ def inner_do_sync(syncs: List[StackBranch], sync_names: List[BranchName]):
     current_branch = get_current_branch_name()
     sync_type = "merge" if get_config().use_merge else "rebase"
     while syncs:
-        with open(TMP_STATE_FILE, "w") as f:
-            json.dump({"branch": current_branch, "sync": sync_names}, f)
-        os.replace(TMP_STATE_FILE, STATE_FILE)
+        save_state({"branch": current_branch, "sync": sync_names})
 
         b = syncs.pop()
         sync_names.pop()
         if b.is_synced_with_parent():
             cout("{} is already synced on top of {}\n", b.name, b.parent.name)
             continue
-        if b.parent.commit in get_commits_between(b.parent_commit, b.commit):
+        # Same as `b.parent.commit in get_commits_between(b.parent_commit, b.commit)`, without
+        # listing the range; the usual "needs a rebase" case is settled by the first check.
+        if is_ancestor(b.parent.commit, b.commit) and not is_ancestor(b.parent.commit, b.parent_commit):
             cout(
                 "Recording complete {} of {} on top of {}\n",
                 sync_type, b.name, b.parent.name, fg="green",
@@ -154,7 +151,7 @@ def inner_do_sync(syncs: List[StackBranch], sync_names: List[BranchName]):
                 print()
                 die(
                     "Automatic {0} failed. Please complete the {0} (fix conflicts; "
-                    "`git {0} --continue`), then run `stacky continue`".format(sync_type)
+                    "`git {0} --continue`), then run `stacky continue`", sync_type
                 )
             b.commit = get_commit(b.name)
         set_parent_commit(b.name, b.parent.commit, b.parent_commit)
@@ -164,25 +161,31 @@ def inner_do_sync(syncs: List[StackBranch], sync_names: List[BranchName]):
 
 def do_sync(forest: BranchesTreeForest):
     """Sync a forest of branches."""
-    print_forest(forest)
-
     syncs: List[StackBranch] = []
     sync_names: List[BranchName] = []
     syncs_set: set[StackBranch] = set()
+    # Status lines are held back so the forest is only rendered when there is work to do.
+    status = []
     for b in forest_depth_first(forest):
         if not b.parent:
-            cout("✓ Not syncing base branch {}\n", b.name, fg="green")
+            status.append(functools.partial(cout, "✓ Not syncing base branch {}\n", b.name, fg="green"))
             continue
         if b.is_synced_with_parent() and b.parent not in syncs_set:
-            cout(
+            status.append(functools.partial(
+                cout,
                 "✓ Not syncing branch {}, already synced with parent {}\n",
                 b.name, b.parent.name, fg="green",
-            )
+            ))
             continue
         syncs.append(b)
         syncs_set.add(b)
         sync_names.append(b.name)
-        cout("- Will sync branch {} on top of {}\n", b.name, b.parent.name)
+        status.append(functools.partial(cout, "- Will sync branch {} on top of {}\n", b.name, b.parent.name))
+
+    if syncs:
+        print_forest(forest)
+    for line in status:
+        line()
 
     if not syncs:
         return
@@ -192,6 +195,45 @@ def do_sync(forest: BranchesTreeForest):
     inner_do_sync(syncs, sync_names)
 
 
+def _update_stack_comments(ordered: List[StackBranch]):
+    """Add or refresh the stack comment on every open PR that is part of a multi-PR stack."""
+    from stacky.pr.cache import clear_gh_cache
+    from stacky.pr.github import build_stack_lines, fetch_pr_bodies, get_stack_comment_edit, run_pr_edits
+
+    stack_lines_by_root = {}
+    pr_count_by_root = {}
+    root_by_branch = {}
+    branches_with_prs = [b for b in ordered if b.open_pr_info]
+
+    for b in branches_with_prs:
+        root = b
+        while root.parent and root.parent.name not in STACK_BOTTOMS:
+            root = root.parent
+        root_by_branch[b.name] = root.name
+        if root.name not in stack_lines_by_root:
+            complete_forest = get_complete_stack_forest_for_branch(b)
+            load_pr_info_for_forest(complete_forest)
+            # The stack body is the same for every PR in it; only the current marker differs.
+            stack_lines_by_root[root.name] = build_stack_lines(complete_forest)
+            pr_count_by_root[root.name] = sum(1 for sb, _ in stack_lines_by_root[root.name] if sb.open_pr_info)
+
+    # A stack comment listing a single PR tells the reader nothing; skip those stacks entirely.
+    branches_with_prs = [b for b in branches_with_prs if pr_count_by_root[root_by_branch[b.name]] > 1]
+    pr_numbers = []
+    for b in branches_with_prs:
+        assert b.open_pr_info is not None
+        pr_numbers.append(b.open_pr_info["number"])
+    bodies = fetch_pr_bodies(pr_numbers)
+    comment_edits = []
+    for b in branches_with_prs:
+        cmd = get_stack_comment_edit(b, stack_lines_by_root[root_by_branch[b.name]], bodies)
+        if cmd is not None:
+            comment_edits.append(cmd)
+    run_pr_edits(comment_edits)
+    if comment_edits:
+        clear_gh_cache()
+
+
 def do_push(
     forest: BranchesTreeForest,
     *,
@@ -200,13 +242,15 @@ def do_push(
     remote_name: str = "origin",
 ):
     """Push branches in a forest."""
-    from stacky.pr.github import add_or_update_stack_comment, create_gh_pr
+    from stacky.pr.cache import clear_gh_cache
+    from stacky.pr.github import create_gh_pr, run_pr_edits
     from stacky.utils.ui import confirm
 
     if pr:
         load_pr_info_for_forest(forest)
     print_forest(forest)
-    for b in forest_depth_first(forest):
+    ordered = list(forest_depth_first(forest))
+    for b in ordered:
         if not b.is_synced_with_parent():
             die(
                 "Branch {} is not synced with parent {}, sync first",
@@ -217,7 +261,7 @@ def do_push(
     PR_FIX_BASE = 1
     PR_CREATE = 2
     actions = []
-    for b in forest_depth_first(forest):
+    for b in ordered:
         if not b.parent:
             cout("✓ Not pushing base branch {}\n", b.name, fg="green")
             continue
@@ -267,53 +311,43 @@ def do_push(
     else:
         prefix = ""
 
-    muxed = False
-    for b, push, pr_action in actions:
+    # One `git push` per remote with every refspec, so the remote negotiates a single pack.
+    pushes_by_remote: Dict[str, List[StackBranch]] = {}
+    for b, push, _ in actions:
         if push:
-            if not muxed:
-                start_muxed_ssh(remote_name)
-                muxed = True
-            cout("Pushing {}\n", b.name, fg="green")
-            cmd_args = ["git", "push"]
-            if get_config().use_force_push:
-                cmd_args.append("--force-with-lease")
-            cmd_args.extend([b.remote, "{}:{}".format(b.name, b.remote_branch)])
-            run(CmdArgs(cmd_args), out=True)
+            pushes_by_remote.setdefault(b.remote, []).append(b)
+    if pushes_by_remote:
+        start_muxed_ssh(remote_name)
+    for remote, branches in pushes_by_remote.items():
+        cout("Pushing {}\n", ", ".join(b.name for b in branches), fg="green")
+        cmd_args = ["git", "push"]
+        if get_config().use_force_push:
+            cmd_args.append("--force-with-lease")
+        cmd_args.append(remote)
+        cmd_args.extend(f"{b.name}:{b.remote_branch}" for b in branches)
+        run(CmdArgs(cmd_args), out=True)
+
+    base_edits = []
+    for b, _, pr_action in actions:
         if pr_action == PR_FIX_BASE:
             cout("Fixing PR base for {}\n", b.name, fg="green")
             assert b.open_pr_info is not None
-            run(
+            base_edits.append(
                 CmdArgs([
                     "gh", "pr", "edit", str(b.open_pr_info["number"]),
                     "--base", b.parent.name,
-                ]),
-                out=True,
+                ])
             )
         elif pr_action == PR_CREATE:
             create_gh_pr(b, prefix)
+    run_pr_edits(base_edits)
+    # Pushed, created or retargeted PRs make cached `gh` listings stale for `inbox`/`prs`.
+    clear_gh_cache()
 
     # Handle stack comments for PRs
     if pr and get_config().enable_stack_comment:
         load_pr_info_for_forest(forest)
-        complete_forests_by_root = {}
-        branches_with_prs = [b for b in forest_depth_first(forest) if b.open_pr_info]
-
-        for b in branches_with_prs:
-            root = b
-            while root.parent and root.parent.name not in STACK_BOTTOMS:
-                root = root.parent
-            root_name = root.name
-            if root_name not in complete_forests_by_root:
-                complete_forest = get_complete_stack_forest_for_branch(b)
-                load_pr_info_for_forest(complete_forest)
-                complete_forests_by_root[root_name] = complete_forest
-
-        for b in branches_with_prs:
-            root = b
-            while root.parent and root.parent.name not in STACK_BOTTOMS:
-                root = root.parent
-            complete_forest = complete_forests_by_root[root.name]
-            add_or_update_stack_comment(b, complete_forest)
+        _update_stack_comments(ordered)
 
     stop_muxed_ssh(remote_name)
 
@@ -332,7 +366,7 @@ def get_branches_to_delete(forest: BranchesTreeForest) -> List[StackBranch]:
                 b.name, pr_info["number"], b.parent.name,
             )
             deletes.append(b)
-            for c in b.children:
+            for c in b.children.values():
                 cout("- Will reparent branch {} onto {}\n", c.name, b.parent.name)
             break
     return deletes
@@ -344,40 +378,41 @@ def delete_branches(stack: StackBranchSet, deletes: List[StackBranch]):
 
     current_branch = get_current_branch_name()
     for b in deletes:
-        for c in b.children:
+        for c in b.children.values():
             info("Reparenting {} onto {}", c.name, b.parent.name)
             c.parent = b.parent
             set_parent(c.name, b.parent.name)
         info("Deleting {}", b.name)
         if b.name == current_branch:
-            new_branch = next(iter(stack.bottoms))
+            new_branch = next(iter(stack.bottoms.values()))
             info("About to delete current branch, switching to {}", new_branch.name)
             run(CmdArgs(["git", "checkout", new_branch.name]))
             set_current_branch(new_branch.name)
-        run(CmdArgs(["git", "branch", "-D", b.name]))
+    if deletes:
+        # `git branch -D` takes any number of branches; delete them all in one go.
+        run(CmdArgs(["git", "branch", "-D", *(b.name for b in deletes)]))
 
 
 def cleanup_unused_refs(stack: StackBranchSet):
     """Clean up refs for non-existent branches."""
-    from stacky.git.refs import get_all_stack_parent_refs
-
     info("Cleaning up unused refs")
-    existing_branches = set(get_all_branches())
-
-    stack_bottoms = get_all_stack_bottoms()
-    for bottom in stack_bottoms:
-        if bottom not in stack.stack or bottom not in existing_branches:
-            ref = "refs/stacky-bottom-branch/{}".format(bottom)
-            info("Deleting ref {} (branch {} no longer exists)".format(ref, bottom))
-            run(CmdArgs(["git", "update-ref", "-d", ref]))
-
-    stack_parent_refs = get_all_stack_parent_refs()
-    for br in stack_parent_refs:
-        if br not in stack.stack or br not in existing_branches:
-            ref = "refs/stack-parent/{}".format(br)
-            old_value = run(CmdArgs(["git", "show-ref", ref]), check=False)
-            if old_value:
-                info("Deleting ref {} (branch {} no longer exists)".format(old_value, br))
-            else:
-                info("Deleting ref refs/stack-parent/{} (branch {} no longer exists)".format(br, br))
-            run(CmdArgs(["git", "update-ref", "-d", ref]))
+    # One listing covers the existing branches and both kinds of stacky refs.
+    out = run_multiline(
+        CmdArgs([
+            "git", "for-each-ref", "--format=%(refname) %(objectname)",
+            "refs/heads", "refs/stacky-bottom-branch", "refs/stack-parent",
+        ])
+    )
+    refs = dict(line.split(" ", 1) for line in (out or "").splitlines() if line)
+    existing_branches = {ref.removeprefix("refs/heads/") for ref in refs if ref.startswith("refs/heads/")}
+
+    deletes: List[Tuple[str, Optional[str]]] = []
+    for prefix in ("refs/stacky-bottom-branch/", "refs/stack-parent/"):
+        for ref, sha in refs.items():
+            if not ref.startswith(prefix):
+                continue
+            br = ref.removeprefix(prefix)
+            if br not in stack.stack or br not in existing_branches:
+                info("Deleting ref {} {} (branch {} no longer exists)", sha, ref, br)
+                deletes.append((ref, None))
+    update_refs(deletes)
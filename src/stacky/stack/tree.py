@@ -1,5 +1,7 @@
 """Tree formatting and traversal for stacky stacks."""
 
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Generator, List, TYPE_CHECKING
 
 from stacky.git.branch import get_current_branch_name
@@ -15,22 +17,17 @@ def get_pr_status_emoji(pr_info) -> str:
     """Get the status emoji for a PR based on review state."""
     if not pr_info:
         return ""
-
-    review_decision = pr_info.get('reviewDecision')
-    review_requests = pr_info.get('reviewRequests', [])
-    is_draft = pr_info.get('isDraft', False)
-
-    if is_draft:
+    # Checked in priority order; later fields are only read if needed.
+    if pr_info.get("isDraft"):
         # Draft PRs are waiting on author
         return " 🚧"
-    elif review_decision == "APPROVED":
+    if pr_info.get("reviewDecision") == "APPROVED":
         return " ✅"
-    elif review_requests and len(review_requests) > 0:
+    if pr_info.get("reviewRequests"):
         # Has pending review requests - waiting on review
         return " 🔄"
-    else:
-        # No pending review requests, likely needs changes or author action
-        return " ❌"
+    # No pending review requests, likely needs changes or author action
+    return " ❌"
 
 
 def make_tree_node(b: "StackBranch") -> TreeNode:
@@ -40,7 +37,16 @@ def make_tree_node(b: "StackBranch") -> TreeNode:
 
 def make_subtree(b: "StackBranch") -> BranchesTree:
     """Create a subtree for a branch's children."""
-    return BranchesTree(dict(make_tree_node(c) for c in sorted(b.children, key=lambda x: x.name)))
+    root = BranchesTree({})
+    # Children are inserted when their parent is visited, so each dict keeps name order.
+    pending = [(b, root)]
+    while pending:
+        parent, subtree = pending.pop()
+        for c in parent.children.values():
+            children = BranchesTree({})
+            subtree[c.name] = (c, children)
+            pending.append((c, children))
+    return root
 
 
 def make_tree(b: "StackBranch") -> BranchesTree:
@@ -96,8 +102,9 @@ def print_tree(tree: BranchesTree):
     """Print a tree (upside down to match upstack/downstack nomenclature)."""
     from stacky.utils.ui import ASCII_TREE
     s = ASCII_TREE(format_tree(tree, colorize=COLOR_STDOUT))
-    lines = s.split("\n")
-    print("\n".join(reversed(lines)))
+    lines = s.splitlines()
+    sys.stdout.write("\n".join(lines[::-1]))
+    sys.stdout.write("\n")
 
 
 def print_forest(trees: List[BranchesTree]):
@@ -111,21 +118,25 @@ def print_forest(trees: List[BranchesTree]):
 def forest_depth_first(forest: BranchesTreeForest) -> Generator["StackBranch", None, None]:
     """Iterate over a forest in depth-first order."""
     for tree in forest:
-        for b in depth_first(tree):
-            yield b
+        yield from depth_first(tree)
 
 
 def depth_first(tree: BranchesTree) -> Generator["StackBranch", None, None]:
     """Iterate over a tree in depth-first order."""
-    for _, (branch, children) in tree.items():
+    stack = [iter(tree.values())]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+            continue
+        branch, children = item
         yield branch
-        for b in depth_first(children):
-            yield b
+        stack.append(iter(children.values()))
 
 
 def get_all_stacks_as_forest(stack: "StackBranchSet") -> BranchesTreeForest:
     """Get all stacks as a forest."""
-    return BranchesTreeForest([make_tree(b) for b in stack.bottoms])
+    return BranchesTreeForest([make_tree(b) for b in stack.bottoms.values()])
 
 
 def get_current_stack_as_forest(stack: "StackBranchSet") -> BranchesTreeForest:
@@ -166,19 +177,25 @@ def get_bottom_level_branches_as_forest(stack: "StackBranchSet") -> BranchesTree
                 {
                     bottom.name: (
                         bottom,
-                        BranchesTree({b.name: (b, BranchesTree({})) for b in bottom.children}),
+                        BranchesTree({b.name: (b, BranchesTree({})) for b in bottom.children.values()}),
                     )
                 }
             )
-            for bottom in stack.bottoms
+            for bottom in stack.bottoms.values()
         ]
     )
 
 
 def load_pr_info_for_forest(forest: BranchesTreeForest):
     """Load PR info for all branches in a forest."""
-    for b in forest_depth_first(forest):
-        b.load_pr_info()
+    branches = list(forest_depth_first(forest))
+    if not branches:
+        return
+    # Each branch is its own `gh` round-trip; run them together so the wait is the slowest, not the sum.
+    with ThreadPoolExecutor(max_workers=min(8, len(branches))) as executor:
+        # Consume the results so a failed lookup (e.g. die()) surfaces here.
+        for _ in executor.map(lambda b: b.load_pr_info(), branches):
+            pass
 
 
 def get_complete_stack_forest_for_branch(branch: "StackBranch") -> BranchesTreeForest:
@@ -145,6 +145,10 @@ def test_multi_commit_fold(toy_repo):
         assert f"b{i}" in a_tree, f"b{i} missing after multi-commit fold"
     assert "a0" in a_tree  # original A commit preserved
 
+    # Commits are replayed oldest first, preserving B's history order.
+    subjects = toy_repo.git("log", "--format=%s", "--no-merges", "master..A").split("\n")
+    assert subjects == ["B2", "B1", "B0", "A0"]
+
 
 def test_custom_bottom_usable_as_stack_root(toy_repo):
     """After `upstack as bottom`, can build new branches on top of the new bottom.
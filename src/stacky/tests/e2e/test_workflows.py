@@ -111,8 +111,9 @@ def test_fold_collapses_branch_into_parent(toy_repo):
     a_files = toy_repo.git("ls-tree", "--name-only", "A").split("\n")
     assert "a" in a_files
     assert "b" in a_files
-    # stack-parent ref for B is cleaned up.
+    # stack-parent ref and branch config for B are cleaned up.
     assert stack_parent_ref(toy_repo, "B") is None
+    assert toy_repo.git("config", "--get-regexp", r"^branch\.B\.", check=False) == ""
 
 
 def test_adopt_untracked_branch(toy_repo):
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Tests for stacky.commands.inbox module."""
+
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from stacky.commands.inbox import cmd_inbox, cmd_prs, fetch_editable_prs, fetch_inbox_prs, get_check_status
+
+
+class TestFetchInboxPrs(unittest.TestCase):
+    """Tests for fetch_inbox_prs function."""
+
+    @patch("stacky.commands.inbox.cached_gh")
+    def test_fetches_both_lists(self, mock_run):
+        """Test authored and review-requested PRs are returned separately."""
+        def fake_run(key, cmd):
+            if "--author" in cmd:
+                return json.dumps([{"number": 1}]).encode()
+            return json.dumps([{"number": 2}]).encode()
+
+        mock_run.side_effect = fake_run
+
+        mine, review = fetch_inbox_prs("number")
+
+        self.assertEqual(mine, [{"number": 1}])
+        self.assertEqual(review, [{"number": 2}])
+        self.assertEqual(mock_run.call_count, 2)
+        for call in mock_run.call_args_list:
+            self.assertIn("number", call.args[1])
+
+    @patch("stacky.commands.inbox.cached_gh")
+    def test_propagates_failure(self, mock_run):
+        """Test a failing gh call surfaces in the caller."""
+        mock_run.side_effect = SystemExit(1)
+
+        with self.assertRaises(SystemExit):
+            list(fetch_inbox_prs("number"))
+
+
+class TestFetchEditablePrs(unittest.TestCase):
+    """Tests for fetch_editable_prs function."""
+
+    @patch("stacky.commands.inbox.cached_gh")
+    def test_single_graphql_request(self, mock_gh):
+        """Test both searches come back from one gh api call."""
+        mock_gh.return_value = json.dumps({"data": {
+            "mine": {"nodes": [{"number": 1, "title": "a", "body": "", "url": "u1"}]},
+            "review": {"nodes": [{"number": 2, "title": "b", "body": "x", "url": "u2"}]},
+        }}).encode()
+
+        mine, review = fetch_editable_prs()
+
+        mock_gh.assert_called_once()
+        argv = mock_gh.call_args.args[1]
+        self.assertEqual(argv[:3], ["gh", "api", "graphql"])
+        self.assertTrue(any("author:@me" in a for a in argv))
+        self.assertTrue(any("review-requested:@me" in a for a in argv))
+        self.assertEqual([pr["number"] for pr in mine], [1])
+        self.assertEqual([pr["number"] for pr in review], [2])
+
+
+class TestGetCheckStatus(unittest.TestCase):
+    """Tests for get_check_status function."""
+
+    def _status(self, *states):
+        return get_check_status({"statusCheckRollup": [{"state": s} for s in states]})
+
+    def test_no_checks(self):
+        """Test PRs without usable checks report nothing."""
+        self.assertEqual(get_check_status({"statusCheckRollup": None}), ("", "gray"))
+        self.assertEqual(get_check_status({"statusCheckRollup": [{"name": "x"}]}), ("", "gray"))
+
+    def test_failure_wins(self):
+        """Test any failure or error marks the checks failed."""
+        self.assertEqual(self._status("PENDING", "SUCCESS", "ERROR"), ("✗ Checks failed", "red"))
+
+    def test_pending(self):
+        """Test pending checks take precedence over other non-failures."""
+        self.assertEqual(self._status("SUCCESS", "QUEUED", "NEUTRAL"), ("⏳ Checks running", "yellow"))
+
+    def test_all_success(self):
+        """Test all-successful checks are reported as passed."""
+        self.assertEqual(self._status("SUCCESS", "SUCCESS"), ("✓ Checks passed", "green"))
+
+    def test_mixed(self):
+        """Test other combinations are reported as mixed."""
+        self.assertEqual(self._status("SUCCESS", "NEUTRAL"), ("Checks mixed", "yellow"))
+
+
+class TestCmdInbox(unittest.TestCase):
+    """Tests for cmd_inbox function."""
+
+    @patch("stacky.commands.inbox.COLOR_STDOUT", False)
+    @patch("sys.stdout.write")
+    @patch("stacky.commands.inbox.fetch_inbox_prs")
+    def test_renders_authored_before_review(self, mock_fetch, mock_write):
+        """Test authored PRs are written out before the review list is needed."""
+        pr = {
+            "number": 7, "title": "Fix it", "headRefName": "fix", "baseRefName": "main",
+            "url": "https://example.com/7", "createdAt": "2024-01-01T00:00:00Z",
+            "updatedAt": "2024-01-02T00:00:00Z", "author": {"login": "me"},
+            "isDraft": False, "reviewDecision": "APPROVED", "reviewRequests": [],
+            "statusCheckRollup": [],
+        }
+        written_before_review = []
+
+        def batches():
+            yield [pr]
+            written_before_review.extend(c.args[0] for c in mock_write.call_args_list)
+            yield []
+
+        mock_fetch.return_value = batches()
+        args = MagicMock()
+        args.compact = True
+
+        cmd_inbox(MagicMock(), args)
+
+        self.assertEqual(mock_write.call_count, 2)
+        mine = "".join(written_before_review)
+        self.assertIn("Your PRs - Approved:", mine)
+        self.assertIn("#7", mine)
+        self.assertIn("Fix it", mine)
+        self.assertIn("No pull requests awaiting your review.", mock_write.call_args.args[0])
+
+
+class TestCmdPrs(unittest.TestCase):
+    """Tests for cmd_prs function."""
+
+    @patch("stacky.commands.inbox.IS_TERMINAL", True)
+    @patch("stacky.commands.inbox.TerminalMenu")
+    @patch("stacky.commands.inbox.fetch_editable_prs")
+    def test_menu_lists_each_pr_once(self, mock_fetch, mock_menu):
+        """Test a PR that is both authored and review-requested appears once."""
+        mock_fetch.return_value = (
+            [{"number": 1, "title": "mine"}, {"number": 2, "title": "both"}],
+            [{"number": 2, "title": "both"}, {"number": 3, "title": "theirs"}],
+        )
+        mock_menu.return_value.show.return_value = None
+
+        with patch("stacky.commands.inbox.cout"):
+            cmd_prs(MagicMock(), MagicMock())
+
+        options = mock_menu.call_args.args[0]
+        self.assertEqual(options, ["#1 mine", "#2 both", "#3 theirs", "Exit"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,185 +1,124 @@
 #!/usr/bin/env python3
 """Tests for stacky.commands.land module."""
 
+import argparse
+import dataclasses
 import unittest
-from unittest.mock import patch, MagicMock
+from typing import Dict, List, Optional
+from unittest.mock import patch
 
 from stacky.commands.land import cmd_land
+from stacky.utils.logging import ExitException
 
 
+@dataclasses.dataclass(eq=False)
+class FakeBranch:
+    """Just enough of StackBranch for cmd_land, recording the calls made on it."""
+    name: str
+    parent: Optional["FakeBranch"] = None
+    commit: str = "abc123"
+    synced_with_parent: bool = True
+    synced_with_remote: bool = True
+    open_pr_info: Optional[dict] = None
+    calls: List[str] = dataclasses.field(default_factory=list)
+
+    def is_synced_with_parent(self) -> bool:
+        self.calls.append("is_synced_with_parent")
+        return self.synced_with_parent
+
+    def is_synced_with_remote(self) -> bool:
+        self.calls.append("is_synced_with_remote")
+        return self.synced_with_remote
+
+    def load_pr_info(self, *, minimal: bool = False):
+        self.calls.append(f"load_pr_info(minimal={minimal})")
+
+
+@dataclasses.dataclass
+class FakeStack:
+    """Just enough of StackBranchSet for cmd_land."""
+    bottoms: Dict[str, FakeBranch]
+
+
+def _downstack(bottom: FakeBranch, branch: FakeBranch):
+    return [{bottom.name: (bottom, {branch.name: (branch, None)})}]
+
+
+@patch("stacky.commands.land.get_current_branch_name", return_value="feature")
+@patch("stacky.commands.land.get_current_downstack_as_forest")
+@patch("stacky.commands.land.die", side_effect=ExitException("die"))
 class TestCmdLand(unittest.TestCase):
     """Tests for cmd_land function."""
 
+    def setUp(self):
+        self.bottom = FakeBranch("main")
+        self.stack = FakeStack({self.bottom.name: self.bottom})
+        self.args = argparse.Namespace(force=False, auto=False)
+
+    def _feature(self, **kwargs) -> FakeBranch:
+        return FakeBranch("feature", parent=self.bottom, **kwargs)
+
     @patch("stacky.commands.land.COLOR_STDOUT", True)
     @patch("sys.stdout.write")
-    @patch("stacky.commands.land.get_current_branch_name")
-    @patch("stacky.commands.land.get_current_downstack_as_forest")
-    @patch("stacky.commands.land.die")
     @patch("stacky.commands.land.cout")
     @patch("stacky.commands.land.confirm")
+    @patch("stacky.commands.land.clear_gh_cache")
     @patch("stacky.commands.land.run")
     def test_cmd_land_success(
-        self,
-        mock_run,
-        mock_confirm,
-        mock_cout,
-        mock_die,
-        mock_forest,
-        mock_current_branch,
-        mock_write,
+        self, mock_run, mock_clear, mock_confirm, mock_cout, mock_write, mock_die, mock_forest, mock_current_branch,
     ):
         """Test successful land command."""
-        args = MagicMock()
-        args.force = False
-        args.auto = False
-
-        bottom_branch = MagicMock()
-        bottom_branch.name = "main"
-
-        stack = MagicMock()
-        stack.bottoms = {bottom_branch}
-
-        branch = MagicMock()
-        branch.name = "feature"
-        branch.is_synced_with_parent.return_value = True
-        branch.is_synced_with_remote.return_value = True
-        branch.load_pr_info.return_value = None
-        branch.open_pr_info = {
+        branch = self._feature(open_pr_info={
             "mergeable": "MERGEABLE",
             "number": 1,
             "url": "http://example.com"
-        }
-        branch.parent = MagicMock()
-        branch.parent.name = "main"
-
-        mock_current_branch.return_value = "feature"
-        mock_forest.return_value = [
-            {"main": (bottom_branch, {"feature": (branch, None)})}
-        ]
-        mock_run.return_value = "abc123"
-
-        cmd_land(stack, args)
-
-        mock_forest.assert_called_once_with(stack)
-        branch.is_synced_with_parent.assert_called_once()
-        branch.is_synced_with_remote.assert_called_once()
-        branch.load_pr_info.assert_called_once()
-        mock_confirm.assert_called_once()
-
-    @patch("stacky.commands.land.get_current_branch_name")
-    @patch("stacky.commands.land.get_current_downstack_as_forest")
-    @patch("stacky.commands.land.die")
-    def test_cmd_land_not_synced_parent(
-        self,
-        mock_die,
-        mock_forest,
-        mock_current_branch,
-    ):
-        """Test land fails when not synced with parent."""
-        from stacky.utils.logging import ExitException
-        mock_die.side_effect = ExitException("Not synced with parent")
-
-        args = MagicMock()
-        args.force = False
+        })
+        mock_forest.return_value = _downstack(self.bottom, branch)
 
-        bottom_branch = MagicMock()
-        bottom_branch.name = "main"
+        cmd_land(self.stack, self.args)
 
-        stack = MagicMock()
-        stack.bottoms = {bottom_branch}
-
-        branch = MagicMock()
-        branch.name = "feature"
-        branch.is_synced_with_parent.return_value = False
-        branch.parent = MagicMock()
-        branch.parent.name = "main"
+        mock_forest.assert_called_once_with(self.stack)
+        self.assertEqual(
+            branch.calls,
+            ["is_synced_with_parent", "is_synced_with_remote", "load_pr_info(minimal=True)"],
+        )
+        mock_die.assert_not_called()
+        mock_confirm.assert_called_once()
+        mock_run.assert_called_once_with(
+            ["gh", "pr", "merge", "feature", "--squash", "--match-head-commit", "abc123"], out=True
+        )
+        # The merged PR must not linger in cached `inbox`/`prs` listings.
+        mock_clear.assert_called_once_with()
 
-        mock_current_branch.return_value = "feature"
-        mock_forest.return_value = [
-            {"main": (bottom_branch, {"feature": (branch, None)})}
-        ]
+    def test_cmd_land_not_synced_parent(self, mock_die, mock_forest, mock_current_branch):
+        """Test land fails when not synced with parent."""
+        branch = self._feature(synced_with_parent=False)
+        mock_forest.return_value = _downstack(self.bottom, branch)
 
         with self.assertRaises(ExitException):
-            cmd_land(stack, args)
+            cmd_land(self.stack, self.args)
         mock_die.assert_called()
+        self.assertEqual(branch.calls, ["is_synced_with_parent"])
 
-    @patch("stacky.commands.land.get_current_branch_name")
-    @patch("stacky.commands.land.get_current_downstack_as_forest")
-    @patch("stacky.commands.land.die")
-    def test_cmd_land_not_synced_remote(
-        self,
-        mock_die,
-        mock_forest,
-        mock_current_branch,
-    ):
+    def test_cmd_land_not_synced_remote(self, mock_die, mock_forest, mock_current_branch):
         """Test land fails when not synced with remote."""
-        from stacky.utils.logging import ExitException
-        mock_die.side_effect = ExitException("Not synced with remote")
-
-        args = MagicMock()
-        args.force = False
-
-        bottom_branch = MagicMock()
-        bottom_branch.name = "main"
-
-        stack = MagicMock()
-        stack.bottoms = {bottom_branch}
-
-        branch = MagicMock()
-        branch.name = "feature"
-        branch.is_synced_with_parent.return_value = True
-        branch.is_synced_with_remote.return_value = False
-        branch.parent = MagicMock()
-        branch.parent.name = "main"
-
-        mock_current_branch.return_value = "feature"
-        mock_forest.return_value = [
-            {"main": (bottom_branch, {"feature": (branch, None)})}
-        ]
+        branch = self._feature(synced_with_remote=False)
+        mock_forest.return_value = _downstack(self.bottom, branch)
 
         with self.assertRaises(ExitException):
-            cmd_land(stack, args)
+            cmd_land(self.stack, self.args)
         mock_die.assert_called()
+        self.assertEqual(branch.calls, ["is_synced_with_parent", "is_synced_with_remote"])
 
-    @patch("stacky.commands.land.get_current_branch_name")
-    @patch("stacky.commands.land.get_current_downstack_as_forest")
-    @patch("stacky.commands.land.die")
-    def test_cmd_land_no_open_pr(
-        self,
-        mock_die,
-        mock_forest,
-        mock_current_branch,
-    ):
+    def test_cmd_land_no_open_pr(self, mock_die, mock_forest, mock_current_branch):
         """Test land fails when no open PR."""
-        from stacky.utils.logging import ExitException
-        mock_die.side_effect = ExitException("No open PR")
-
-        args = MagicMock()
-        args.force = False
-
-        bottom_branch = MagicMock()
-        bottom_branch.name = "main"
-
-        stack = MagicMock()
-        stack.bottoms = {bottom_branch}
-
-        branch = MagicMock()
-        branch.name = "feature"
-        branch.is_synced_with_parent.return_value = True
-        branch.is_synced_with_remote.return_value = True
-        branch.load_pr_info.return_value = None
-        branch.open_pr_info = None
-        branch.parent = MagicMock()
-        branch.parent.name = "main"
-
-        mock_current_branch.return_value = "feature"
-        mock_forest.return_value = [
-            {"main": (bottom_branch, {"feature": (branch, None)})}
-        ]
+        branch = self._feature()
+        mock_forest.return_value = _downstack(self.bottom, branch)
 
         with self.assertRaises(ExitException):
-            cmd_land(stack, args)
+            cmd_land(self.stack, self.args)
         mock_die.assert_called()
+        self.assertEqual(branch.calls[-1], "load_pr_info(minimal=True)")
 
 
 if __name__ == "__main__":
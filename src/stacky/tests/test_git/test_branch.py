@@ -6,8 +6,9 @@ from unittest.mock import patch, MagicMock
 
 from stacky.git.branch import (
     get_current_branch, get_all_branches, get_stack_parent_branch,
-    get_real_stack_bottom, checkout, create_branch
+    get_real_stack_bottom, get_top_level_dir, checkout, create_branch
 )
+import stacky.git.branch as branch_module
 from stacky.utils.types import BranchName
 
 
@@ -20,6 +21,8 @@ class TestGetCurrentBranch(unittest.TestCase):
         mock_run.return_value = "refs/heads/feature-branch"
         result = get_current_branch()
         self.assertEqual(result, "feature-branch")
+        # --short is ambiguous ("heads/<name>") when a tag has the same name.
+        self.assertNotIn("--short", mock_run.call_args[0][0])
 
     @patch("stacky.git.branch.run")
     def test_get_current_branch_detached_head(self, mock_run):
@@ -95,6 +98,27 @@ class TestGetRealStackBottom(unittest.TestCase):
         self.assertIsNone(result)
 
 
+class TestGetTopLevelDir(unittest.TestCase):
+    """Tests for get_top_level_dir function."""
+
+    def tearDown(self):
+        branch_module.TOP_LEVEL_DIR = None
+
+    @patch("stacky.git.branch.run_always_return")
+    def test_get_top_level_dir_runs_git(self, mock_run):
+        """Test get_top_level_dir shells out when nothing is cached."""
+        mock_run.return_value = "/repo"
+        self.assertEqual(get_top_level_dir(), "/repo")
+        mock_run.assert_called_once()
+
+    @patch("stacky.git.branch.run_always_return")
+    def test_get_top_level_dir_uses_cache(self, mock_run):
+        """Test get_top_level_dir returns the value cached by init_git."""
+        branch_module.TOP_LEVEL_DIR = "/cached"
+        self.assertEqual(get_top_level_dir(), "/cached")
+        mock_run.assert_not_called()
+
+
 class TestCheckout(unittest.TestCase):
     """Tests for checkout function."""
 
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Tests for stacky.git.catfile module."""
+
+import os
+import subprocess
+import tempfile
+import unittest
+
+import stacky.git.catfile as catfile_module
+from stacky.git.catfile import GitCatFileBatch, resolve_ref
+
+
+def _git(*args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+
+class TestGitCatFileBatch(unittest.TestCase):
+    """Tests for the cat-file coprocess against a scratch repository."""
+
+    def setUp(self):
+        self._old_cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        _git("init", "-q", "-b", "main")
+        _git("commit", "-q", "--allow-empty", "-m", "first")
+        self.batch = GitCatFileBatch()
+
+    def tearDown(self):
+        self.batch.close()
+        if catfile_module._BATCH is not None:
+            catfile_module._BATCH.close()
+            catfile_module._BATCH = None
+        os.chdir(self._old_cwd)
+        self._tmp.cleanup()
+
+    def test_resolve_existing_ref(self):
+        """Test resolving a branch ref returns its commit."""
+        self.assertEqual(self.batch.resolve("refs/heads/main"), _git("rev-parse", "HEAD"))
+
+    def test_resolve_missing_ref(self):
+        """Test resolving a missing ref returns None."""
+        self.assertIsNone(self.batch.resolve("refs/stack-parent/nope"))
+
+    def test_resolve_sees_later_updates(self):
+        """Test refs updated after startup are re-read."""
+        self.batch.resolve("refs/heads/main")
+        _git("commit", "-q", "--allow-empty", "-m", "second")
+        _git("update-ref", "refs/stack-parent/feature", "HEAD~")
+        self.assertEqual(self.batch.resolve("refs/heads/main"), _git("rev-parse", "HEAD"))
+        self.assertEqual(self.batch.resolve("refs/stack-parent/feature"), _git("rev-parse", "HEAD~"))
+
+    def test_resolve_parent_expression(self):
+        """Test revision expressions like `<sha>^` resolve to the parent commit."""
+        first = _git("rev-parse", "HEAD")
+        _git("commit", "-q", "--allow-empty", "-m", "second")
+        self.assertEqual(self.batch.resolve(_git("rev-parse", "HEAD") + "^"), first)
+        self.assertIsNone(self.batch.resolve(first + "^"))
+
+    def test_resolve_rejects_newlines(self):
+        """Test a ref containing a newline is not sent to the coprocess."""
+        self.assertIsNone(self.batch.resolve("refs/heads/main\nrefs/heads/main"))
+        self.assertEqual(self.batch.resolve("refs/heads/main"), _git("rev-parse", "HEAD"))
+
+    def test_resolve_ref_reuses_process(self):
+        """Test the module-level helper keeps one coprocess alive."""
+        resolve_ref("refs/heads/main")
+        first = catfile_module._BATCH
+        resolve_ref("refs/heads/main")
+        self.assertIs(catfile_module._BATCH, first)
+
+
+if __name__ == "__main__":
+    unittest.main()
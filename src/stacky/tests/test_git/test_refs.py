@@ -7,7 +7,7 @@ from unittest.mock import patch
 from stacky.git.refs import (
     get_stack_parent_commit, get_commit, set_parent_commit,
     get_branch_name_from_short_ref, get_all_stack_bottoms,
-    get_commits_between, get_merge_base
+    get_commits_between, get_merge_base, is_ancestor, update_refs, UpdateRefTxn
 )
 from stacky.utils.types import BranchName, Commit
 
@@ -15,14 +15,14 @@ from stacky.utils.types import BranchName, Commit
 class TestGetStackParentCommit(unittest.TestCase):
     """Tests for get_stack_parent_commit function."""
 
-    @patch("stacky.git.refs.run")
+    @patch("stacky.git.refs.resolve_ref")
     def test_get_stack_parent_commit_success(self, mock_run):
         """Test getting parent commit."""
         mock_run.return_value = "abc123"
         result = get_stack_parent_commit(BranchName("feature"))
         self.assertEqual(result, Commit("abc123"))
 
-    @patch("stacky.git.refs.run")
+    @patch("stacky.git.refs.resolve_ref")
     def test_get_stack_parent_commit_none(self, mock_run):
         """Test getting parent commit when not set."""
         mock_run.return_value = None
@@ -33,7 +33,7 @@ class TestGetStackParentCommit(unittest.TestCase):
 class TestGetCommit(unittest.TestCase):
     """Tests for get_commit function."""
 
-    @patch("stacky.git.refs.run")
+    @patch("stacky.git.refs.resolve_ref")
     def test_get_commit(self, mock_run):
         """Test getting branch commit."""
         mock_run.return_value = "def456"
@@ -63,6 +63,66 @@ class TestSetParentCommit(unittest.TestCase):
         self.assertIn("old123", call_args)
 
 
+class TestUpdateRefs(unittest.TestCase):
+    """Tests for update_refs function."""
+
+    @patch("stacky.git.refs.run")
+    def test_update_refs_single_transaction(self, mock_run):
+        """Test updates and deletes go to one update-ref --stdin call."""
+        update_refs([("refs/heads/main", "refs/remotes/origin/main"), ("refs/stack-parent/old", None)])
+        mock_run.assert_called_once_with(
+            ["git", "update-ref", "--stdin"],
+            input="update refs/heads/main refs/remotes/origin/main\ndelete refs/stack-parent/old\n",
+        )
+
+    @patch("stacky.git.refs.run")
+    def test_update_refs_old_values(self, mock_run):
+        """Test expected old values are appended to their refs' lines."""
+        update_refs(
+            [("refs/stack-parent/a", "new"), ("refs/stack-parent/b", "new")],
+            old_values={"refs/stack-parent/a": "old"},
+        )
+        mock_run.assert_called_once_with(
+            ["git", "update-ref", "--stdin"],
+            input="update refs/stack-parent/a new old\nupdate refs/stack-parent/b new\n",
+        )
+
+    @patch("stacky.git.refs.run")
+    def test_update_refs_empty(self, mock_run):
+        """Test nothing runs when there are no updates."""
+        update_refs([])
+        mock_run.assert_not_called()
+
+
+class TestUpdateRefTxn(unittest.TestCase):
+    """Tests for UpdateRefTxn class."""
+
+    @patch("stacky.git.refs.run")
+    def test_commit_sends_queued_lines_once(self, mock_run):
+        """Test updates, deletes and verifies, with and without old values, go out in one call."""
+        txn = UpdateRefTxn()
+        txn.update("refs/stack-parent/a", "new", "old").update("refs/stack-parent/b", "new")
+        txn.delete("refs/stack-parent/c").delete("refs/heads/c", "tip")
+        txn.verify("refs/heads/d", "tip")
+        self.assertEqual(len(txn), 5)
+        mock_run.assert_not_called()
+
+        txn.commit()
+
+        mock_run.assert_called_once_with(
+            ["git", "update-ref", "--stdin"],
+            input="update refs/stack-parent/a new old\nupdate refs/stack-parent/b new\n"
+                  "delete refs/stack-parent/c\ndelete refs/heads/c tip\nverify refs/heads/d tip\n",
+        )
+        self.assertEqual(len(txn), 0)
+
+    @patch("stacky.git.refs.run")
+    def test_commit_empty(self, mock_run):
+        """Test committing an empty transaction runs nothing."""
+        UpdateRefTxn().commit()
+        mock_run.assert_not_called()
+
+
 class TestGetBranchNameFromShortRef(unittest.TestCase):
     """Tests for get_branch_name_from_short_ref function."""
 
@@ -115,6 +175,25 @@ class TestGetCommitsBetween(unittest.TestCase):
         self.assertEqual(result, [])
 
 
+class TestIsAncestor(unittest.TestCase):
+    """Tests for is_ancestor function."""
+
+    @patch("stacky.git.refs.run")
+    def test_is_ancestor_true(self, mock_run):
+        """Test a zero exit status means the commit is an ancestor."""
+        mock_run.return_value = ""
+        self.assertTrue(is_ancestor(Commit("abc123"), Commit("def456")))
+        self.assertEqual(
+            mock_run.call_args[0][0], ["git", "merge-base", "--is-ancestor", "abc123", "def456"]
+        )
+
+    @patch("stacky.git.refs.run")
+    def test_is_ancestor_false(self, mock_run):
+        """Test a non-zero exit status means the commit is not an ancestor."""
+        mock_run.return_value = None
+        self.assertFalse(is_ancestor(Commit("abc123"), Commit("def456")))
+
+
 class TestGetMergeBase(unittest.TestCase):
     """Tests for get_merge_base function."""
 
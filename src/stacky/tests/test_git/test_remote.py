@@ -13,6 +13,9 @@ from stacky.git.remote import (
 class TestGetRemoteType(unittest.TestCase):
     """Tests for get_remote_type function."""
 
+    def setUp(self):
+        get_remote_type.cache_clear()
+
     @patch("stacky.git.remote.run_always_return")
     def test_get_remote_type_ssh(self, mock_run):
         """Test getting SSH remote type."""
@@ -27,6 +30,20 @@ class TestGetRemoteType(unittest.TestCase):
         result = get_remote_type("origin")
         self.assertIsNone(result)
 
+    @patch("stacky.git.remote.run_always_return")
+    def test_get_remote_type_cached(self, mock_run):
+        """Test repeated lookups for a remote only run git once."""
+        mock_run.return_value = "origin\tgit@github.com:user/repo.git (push)"
+        get_remote_type("origin")
+        get_remote_type("origin")
+        mock_run.assert_called_once()
+
+    @patch("stacky.git.remote.run_always_return")
+    def test_get_remote_type_escapes_name(self, mock_run):
+        """Test regex characters in the remote name are matched literally."""
+        mock_run.return_value = "originX\tgit@github.com:user/repo.git (push)"
+        self.assertIsNone(get_remote_type("origin."))
+
 
 class TestGenSshMuxCmd(unittest.TestCase):
     """Tests for gen_ssh_mux_cmd function."""
@@ -89,6 +106,19 @@ class TestStartMuxedSsh(unittest.TestCase):
         # Should not raise any errors
         start_muxed_ssh()
 
+    @patch("stacky.git.remote.subprocess.Popen")
+    @patch("stacky.git.remote.get_remote_type")
+    @patch("stacky.git.remote.get_config")
+    def test_start_muxed_ssh_waits_for_background(self, mock_get_config, mock_get_remote_type, mock_popen):
+        """Test start_muxed_ssh waits for ssh to background itself."""
+        mock_get_config.return_value = MagicMock(share_ssh_session=True)
+        mock_get_remote_type.return_value = "git@github.com"
+        mock_popen.return_value.wait.return_value = 0
+        with patch.dict("os.environ", {}, clear=False):
+            start_muxed_ssh()
+        mock_popen.return_value.wait.assert_called_once_with()
+        self.assertIn("-MNf", mock_popen.call_args[0][0])
+
 
 if __name__ == "__main__":
     unittest.main()
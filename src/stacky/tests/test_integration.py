@@ -41,9 +41,10 @@ class TestStackWorkflow(unittest.TestCase):
 
         # Verify stack structure
         self.assertEqual(len(stack.stack), 2)
-        self.assertIn(main, stack.bottoms)
-        self.assertIn(feature, stack.tops)
-        self.assertIn(feature, main.children)
+        self.assertIs(stack.bottoms[main.name], main)
+        self.assertIs(stack.tops[feature.name], feature)
+        self.assertNotIn(main.name, stack.tops)
+        self.assertIs(main.children[feature.name], feature)
         self.assertEqual(feature.parent, main)
 
     @patch("stacky.stack.models.get_remote_info")
@@ -72,8 +73,8 @@ class TestStackWorkflow(unittest.TestCase):
 
         # Verify structure
         self.assertEqual(len(main.children), 2)
-        self.assertIn(feature1, main.children)
-        self.assertIn(feature2, main.children)
+        self.assertIs(main.children[feature1.name], feature1)
+        self.assertIs(main.children[feature2.name], feature2)
         self.assertEqual(len(stack.tops), 2)
 
     @patch("stacky.stack.models.get_remote_info")
@@ -162,7 +163,7 @@ class TestPRInfoLoading(unittest.TestCase):
 
         # Now loaded
         self.assertTrue(feature._pr_info_loaded)
-        mock_get_pr_info.assert_called_once_with(BranchName("feature"))
+        mock_get_pr_info.assert_called_once_with(BranchName("feature"), minimal=False)
 
 
 if __name__ == "__main__":
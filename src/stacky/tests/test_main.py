@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Tests for stacky.main module."""
+
+import os
+import unittest
+from argparse import ArgumentParser
+from unittest.mock import patch
+
+from stacky.main import (
+    _ALL_COMMAND_SETUPS, _COMMAND_SETUPS, _add_global_arguments, _select_command_setups,
+    _setup_core_commands, _setup_other_commands, _setup_stack_subcommands,
+)
+
+
+class TestSelectCommandSetups(unittest.TestCase):
+    """Tests for lazy subparser construction."""
+
+    def setUp(self):
+        patcher = patch.dict(os.environ)
+        patcher.start()
+        os.environ.pop("_ARGCOMPLETE", None)
+        self.addCleanup(patcher.stop)
+
+    def test_registry_matches_full_parser(self):
+        """Test every top-level command and alias maps to the setup that defines it."""
+        for setup in _ALL_COMMAND_SETUPS:
+            parser = ArgumentParser()
+            subparsers = parser.add_subparsers(dest="command")
+            setup(subparsers)
+            for name in subparsers.choices:
+                self.assertIs(_COMMAND_SETUPS.get(name), setup, name)
+        self.assertEqual(set(_COMMAND_SETUPS.values()), set(_ALL_COMMAND_SETUPS))
+
+    def test_selects_only_invoked_group(self):
+        """Test only the invoked command's group is built."""
+        self.assertEqual(_select_command_setups(["info"]), [_setup_core_commands])
+        self.assertEqual(_select_command_setups(["s", "info"]), [_setup_stack_subcommands])
+        self.assertEqual(
+            _select_command_setups(["--log-level", "debug", "-r", "up", "land"]),
+            [_setup_other_commands],
+        )
+
+    def test_falls_back_to_all(self):
+        """Test help, unknown commands, bad options and completion build everything."""
+        for argv in ([], ["--help"], ["-h", "info"], ["bogus"], ["--log-level"]):
+            self.assertEqual(_select_command_setups(argv), _ALL_COMMAND_SETUPS, argv)
+        os.environ["_ARGCOMPLETE"] = "1"
+        self.assertEqual(_select_command_setups(["info"]), _ALL_COMMAND_SETUPS)
+
+    def test_lazy_parser_parses_command(self):
+        """Test a parser built from the selected group parses the command."""
+        argv = ["--color", "never", "commit", "-m", "msg", "--no-verify"]
+        parser = ArgumentParser()
+        _add_global_arguments(parser)
+        subparsers = parser.add_subparsers(required=True, dest="command")
+        for setup in _select_command_setups(argv):
+            setup(subparsers)
+        args = parser.parse_args(argv)
+        self.assertEqual(args.command, "commit")
+        self.assertEqual(args.message, "msg")
+        self.assertTrue(args.no_verify)
+
+
+if __name__ == "__main__":
+    unittest.main()
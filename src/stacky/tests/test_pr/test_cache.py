@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Tests for stacky.pr.cache module."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from stacky.pr.cache import cached_gh, clear_gh_cache
+
+
+class TestCachedGh(unittest.TestCase):
+    """Tests for cached_gh and clear_gh_cache functions."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        cache_dir = os.path.join(self._tmp.name, "stacky")
+        self._patches = [
+            patch("stacky.pr.cache.CACHE_DIR", cache_dir),
+            patch("stacky.pr.cache.get_top_level_dir", return_value="/repo"),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        self._tmp.cleanup()
+
+    @patch("stacky.pr.cache.run_bytes", return_value=b"[1]")
+    def test_second_call_hits_cache(self, mock_run):
+        """Test a fresh entry is reused without running gh again."""
+        self.assertEqual(cached_gh("k", ["gh", "pr", "list"]), b"[1]")
+        self.assertEqual(cached_gh("k", ["gh", "pr", "list"]), b"[1]")
+        mock_run.assert_called_once()
+
+    @patch("stacky.pr.cache.run_bytes", return_value=b"[1]")
+    def test_expired_entry_is_refetched(self, mock_run):
+        """Test an entry older than the TTL is refreshed."""
+        cached_gh("k", ["gh", "pr", "list"])
+        cached_gh("k", ["gh", "pr", "list"], ttl=0)
+        self.assertEqual(mock_run.call_count, 2)
+
+    @patch("stacky.pr.cache.run_bytes", return_value=b"[1]")
+    def test_entries_are_scoped_by_argv_and_repo(self, mock_run):
+        """Test different queries and repositories don't share entries."""
+        cached_gh("k", ["gh", "pr", "list", "--author", "@me"])
+        cached_gh("k", ["gh", "pr", "list", "--search", "x"])
+        with patch("stacky.pr.cache.get_top_level_dir", return_value="/other"):
+            cached_gh("k", ["gh", "pr", "list", "--author", "@me"])
+        self.assertEqual(mock_run.call_count, 3)
+
+    @patch("stacky.pr.cache.run_bytes", return_value=b"[1]")
+    def test_clear_forces_refetch(self, mock_run):
+        """Test clearing the cache drops existing entries."""
+        cached_gh("k", ["gh", "pr", "list"])
+        clear_gh_cache()
+        cached_gh("k", ["gh", "pr", "list"])
+        self.assertEqual(mock_run.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,11 +2,13 @@
 """Tests for stacky.pr.github module."""
 
 import unittest
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch
 
 from stacky.pr.github import (
     find_issue_marker, find_reviewers, extract_stack_comment,
-    generate_stack_string
+    generate_stack_string, fetch_pr_bodies, build_stack_lines, render_stack_string,
+    get_stack_comment_edit, run_pr_edits, fetch_open_prs_by_head, get_pr_info
 )
 from stacky.utils.types import BranchName, BranchesTreeForest, BranchesTree
 
@@ -59,6 +61,11 @@ class TestFindIssueMarker(unittest.TestCase):
         result = find_issue_marker("anna_01_01_SRE12")
         self.assertEqual(result, "SRE-12")
 
+    def test_long_project_key_no_separator(self):
+        """Test finding issue marker with a longer project key and no separator."""
+        result = find_issue_marker("john_INFRA123-find-things")
+        self.assertEqual(result, "INFRA-123")
+
     def test_no_issue_marker(self):
         """Test no issue marker found."""
         result = find_issue_marker("john_test_12")
@@ -77,8 +84,7 @@ class TestFindReviewers(unittest.TestCase):
     def test_find_reviewers_single(self, mock_run):
         """Test finding single reviewer."""
         mock_run.return_value = "Some commit message\n\nReviewer: alice\n"
-        branch = MagicMock()
-        branch.name = BranchName("feature")
+        branch = SimpleNamespace(name=BranchName("feature"))
         result = find_reviewers(branch)
         self.assertEqual(result, ["alice"])
 
@@ -86,17 +92,22 @@ class TestFindReviewers(unittest.TestCase):
     def test_find_reviewers_multiple(self, mock_run):
         """Test finding multiple reviewers."""
         mock_run.return_value = "Some commit message\n\nReviewers: alice, bob\n"
-        branch = MagicMock()
-        branch.name = BranchName("feature")
+        branch = SimpleNamespace(name=BranchName("feature"))
         result = find_reviewers(branch)
-        self.assertEqual(result, ["alice", " bob"])
+        self.assertEqual(result, ["alice", "bob"])
+
+    @patch("stacky.pr.github.run_multiline")
+    def test_find_reviewers_later_line(self, mock_run):
+        """Test the reviewer line is found anywhere in the body, case-insensitively."""
+        mock_run.return_value = "Some commit message\n\nTested locally.\nreviewers : alice,\n"
+        result = find_reviewers(SimpleNamespace(name=BranchName("feature")))
+        self.assertEqual(result, ["alice"])
 
     @patch("stacky.pr.github.run_multiline")
     def test_find_reviewers_none(self, mock_run):
         """Test no reviewers found."""
         mock_run.return_value = "Some commit message\n"
-        branch = MagicMock()
-        branch.name = BranchName("feature")
+        branch = SimpleNamespace(name=BranchName("feature"))
         result = find_reviewers(branch)
         self.assertIsNone(result)
 
@@ -136,26 +147,126 @@ More description"""
         self.assertEqual(result, "")
 
 
+class TestGetPrInfo(unittest.TestCase):
+    """Tests for get_pr_info function."""
+
+    @patch("stacky.pr.github.run_always_return")
+    def test_open_pr(self, mock_run):
+        """Test the open PR is picked out of all PRs for the branch."""
+        mock_run.return_value = '[{"id": "a", "state": "MERGED"}, {"id": "b", "state": "OPEN"}]'
+        result = get_pr_info(BranchName("feature"))
+        self.assertEqual(set(result.all), {"a", "b"})
+        self.assertEqual(result.open["id"], "b")
+
+    @patch("stacky.pr.github.run_always_return")
+    def test_minimal_fields(self, mock_run):
+        """Test a minimal load only asks for merge-status fields."""
+        mock_run.return_value = "[]"
+        get_pr_info(BranchName("feature"), minimal=True)
+        fields = mock_run.call_args[0][0][4].split(",")
+        self.assertEqual(fields, ["id", "number", "state", "mergeable", "url"])
+
+
+class TestFetchPrBodies(unittest.TestCase):
+    """Tests for fetch_pr_bodies function."""
+
+    @patch("stacky.pr.github.run_always_return")
+    def test_fetch_no_prs(self, mock_run):
+        """Test no request is made when there are no PRs."""
+        self.assertEqual(fetch_pr_bodies([]), {})
+        mock_run.assert_not_called()
+
+    @patch("stacky.pr.github.run_always_return")
+    def test_fetch_multiple_prs_in_one_call(self, mock_run):
+        """Test bodies for several PRs come back from a single query."""
+        mock_run.return_value = (
+            '{"data": {"repository": {"pr1": {"body": "first"}, "pr2": {"body": null}}}}'
+        )
+        result = fetch_pr_bodies([1, 2])
+        self.assertEqual(result, {1: "first", 2: ""})
+        mock_run.assert_called_once()
+        query = mock_run.call_args[0][0][-1]
+        self.assertIn("pr1: pullRequest(number: 1)", query)
+        self.assertIn("pr2: pullRequest(number: 2)", query)
+
+
+class TestFetchOpenPrsByHead(unittest.TestCase):
+    """Tests for fetch_open_prs_by_head function."""
+
+    @patch("stacky.pr.github.run_always_return")
+    def test_groups_prs_by_head(self, mock_run):
+        """Test open PRs are keyed by head branch with their first commit."""
+        mock_run.return_value = """{"data": {"repository": {"pullRequests": {"nodes": [
+            {"number": 1, "headRefName": "a", "baseRefName": "main",
+             "commits": {"nodes": [{"commit": {"oid": "aaa"}}]}},
+            {"number": 2, "headRefName": "b", "baseRefName": "a",
+             "commits": {"nodes": [{"commit": {"oid": "bbb"}}]}}
+        ]}}}}"""
+        result = fetch_open_prs_by_head()
+        mock_run.assert_called_once()
+        self.assertEqual(set(result), {"a", "b"})
+        self.assertEqual(result["b"][0]["baseRefName"], "a")
+        self.assertEqual(result["b"][0]["commits"], [{"oid": "bbb"}])
+
+
+class TestGetStackCommentEdit(unittest.TestCase):
+    """Tests for get_stack_comment_edit function."""
+
+    def setUp(self):
+        self.branch = SimpleNamespace(name=BranchName("feature"), open_pr_info={"number": 7})
+        self.lines = [(self.branch, "- feature (#7)")]
+
+    @patch("stacky.pr.github.cout")
+    def test_appends_missing_comment(self, mock_cout):
+        """Test a body without a stack comment gets one appended."""
+        cmd = get_stack_comment_edit(self.branch, self.lines, {7: "Description"})
+        self.assertEqual(cmd[:4], ["gh", "pr", "edit", "7"])
+        self.assertTrue(cmd[-1].startswith("Description\n\n<!-- Stacky Stack Info -->"))
+
+    @patch("stacky.pr.github.cout")
+    def test_replaces_outdated_comment_in_place(self, mock_cout):
+        """Test an outdated stack comment is replaced without touching the rest of the body."""
+        old = "<!-- Stacky Stack Info -->\n**Stack:**\n- old\n<!-- End Stacky Stack Info -->"
+        cmd = get_stack_comment_edit(self.branch, self.lines, {7: f"Before\n\n{old}\n\nAfter"})
+        new = render_stack_string(self.lines, self.branch)
+        self.assertEqual(cmd[-1], f"Before\n\n{new}\n\nAfter")
+
+    @patch("stacky.pr.github.cout")
+    def test_no_edit_when_up_to_date(self, mock_cout):
+        """Test no command is returned when the comment is already correct."""
+        body = render_stack_string(self.lines, self.branch)
+        self.assertIsNone(get_stack_comment_edit(self.branch, self.lines, {7: body}))
+
+
+class TestRunPrEdits(unittest.TestCase):
+    """Tests for run_pr_edits function."""
+
+    @patch("stacky.pr.github.sys.stdout")
+    @patch("stacky.utils.shell.run_multiline")
+    def test_output_in_submission_order(self, mock_run, mock_stdout):
+        """Test every command runs and output is written in order."""
+        mock_run.side_effect = lambda cmd: f"{cmd[3]}\n"
+        run_pr_edits([["gh", "pr", "edit", "1"], ["gh", "pr", "edit", "2"]])
+        self.assertEqual(mock_run.call_count, 2)
+        written = [c[0][0] for c in mock_stdout.write.call_args_list]
+        self.assertEqual(written, ["1\n", "2\n"])
+
+
 class TestGenerateStackString(unittest.TestCase):
     """Tests for generate_stack_string function."""
 
     def test_generate_empty_forest(self):
         """Test generating stack string for empty forest."""
         forest = BranchesTreeForest([])
-        branch = MagicMock()
-        branch.name = BranchName("feature")
+        branch = SimpleNamespace(name=BranchName("feature"))
         result = generate_stack_string(forest, branch)
         self.assertEqual(result, "")
 
     def test_generate_with_branches(self):
         """Test generating stack string with branches."""
-        branch1 = MagicMock()
-        branch1.name = BranchName("feature-1")
-        branch1.open_pr_info = {"number": 1}
+        branch1 = SimpleNamespace(name=BranchName("feature-1"), open_pr_info={"number": 1})
 
-        branch2 = MagicMock()
-        branch2.name = BranchName("feature-2")
-        branch2.open_pr_info = {"number": 2}
+        branch2 = SimpleNamespace(name=BranchName("feature-2"), open_pr_info={"number": 2})
 
         tree = BranchesTree({
             "feature-1": (branch1, BranchesTree({
@@ -170,6 +281,24 @@ class TestGenerateStackString(unittest.TestCase):
         self.assertIn("feature-2", result)
         self.assertIn("CURRENT PR", result)
 
+    def test_render_marks_only_current_branch(self):
+        """Test lines built once can be rendered for each branch in the stack."""
+        branch1 = SimpleNamespace(name=BranchName("feature-1"), open_pr_info=None)
+
+        branch2 = SimpleNamespace(name=BranchName("feature-2"), open_pr_info=None)
+
+        tree = BranchesTree({
+            "feature-1": (branch1, BranchesTree({
+                "feature-2": (branch2, BranchesTree({}))
+            }))
+        })
+        lines = build_stack_lines(BranchesTreeForest([tree]))
+        self.assertEqual(lines, [(branch1, "- feature-1"), (branch2, "  - feature-2")])
+
+        result = render_stack_string(lines, branch1)
+        self.assertIn("- feature-1 ← (CURRENT PR)", result)
+        self.assertNotIn("feature-2 ←", result)
+
 
 if __name__ == "__main__":
     unittest.main()
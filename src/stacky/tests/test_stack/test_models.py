@@ -2,7 +2,8 @@
 """Tests for stacky.stack.models module."""
 
 import unittest
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch
 
 from stacky.stack.models import PRInfo, PRInfos, StackBranch, StackBranchSet
 from stacky.utils.types import BranchName, Commit
@@ -28,15 +29,18 @@ class TestPRInfos(unittest.TestCase):
 class TestStackBranch(unittest.TestCase):
     """Tests for StackBranch class."""
 
-    @patch("stacky.stack.models.get_remote_info")
-    @patch("stacky.stack.models.get_commit")
-    def test_stack_branch_creation(self, mock_get_commit, mock_get_remote):
-        """Test StackBranch creation."""
-        mock_get_commit.return_value = Commit("abc123")
-        mock_get_remote.return_value = ("origin", BranchName("feature"), Commit("abc123"))
+    def setUp(self):
+        for target, value in (
+            ("get_commit", Commit("abc123")),
+            ("get_remote_info", ("origin", BranchName("feature"), Commit("abc123"))),
+        ):
+            patcher = patch(f"stacky.stack.models.{target}", return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
 
-        parent = MagicMock()
-        parent.commit = Commit("parent123")
+    def test_stack_branch_creation(self):
+        """Test StackBranch creation."""
+        parent = SimpleNamespace(commit=Commit("parent123"))
 
         branch = StackBranch(
             name=BranchName("feature"),
@@ -49,15 +53,9 @@ class TestStackBranch(unittest.TestCase):
         self.assertEqual(branch.parent_commit, Commit("parent123"))
         self.assertEqual(branch.commit, Commit("abc123"))
 
-    @patch("stacky.stack.models.get_remote_info")
-    @patch("stacky.stack.models.get_commit")
-    def test_is_synced_with_parent(self, mock_get_commit, mock_get_remote):
+    def test_is_synced_with_parent(self):
         """Test is_synced_with_parent method."""
-        mock_get_commit.return_value = Commit("abc123")
-        mock_get_remote.return_value = ("origin", BranchName("feature"), Commit("abc123"))
-
-        parent = MagicMock()
-        parent.commit = Commit("parent123")
+        parent = SimpleNamespace(commit=Commit("parent123"))
 
         branch = StackBranch(
             name=BranchName("feature"),
@@ -71,13 +69,8 @@ class TestStackBranch(unittest.TestCase):
         parent.commit = Commit("different")
         self.assertFalse(branch.is_synced_with_parent())
 
-    @patch("stacky.stack.models.get_remote_info")
-    @patch("stacky.stack.models.get_commit")
-    def test_is_synced_with_remote(self, mock_get_commit, mock_get_remote):
+    def test_is_synced_with_remote(self):
         """Test is_synced_with_remote method."""
-        mock_get_commit.return_value = Commit("abc123")
-        mock_get_remote.return_value = ("origin", BranchName("feature"), Commit("abc123"))
-
         branch = StackBranch(
             name=BranchName("feature"),
             parent=None,
@@ -90,24 +83,39 @@ class TestStackBranch(unittest.TestCase):
         branch.remote_commit = Commit("different")
         self.assertFalse(branch.is_synced_with_remote())
 
+    def test_no_instance_dict(self):
+        """Test branches keep their attributes in slots, not a per-instance dict."""
+        branch = StackBranch(
+            BranchName("feature"), None, None,  # type: ignore
+            commit=Commit("abc123"), remote_info=("origin", BranchName("feature"), None),
+        )
+
+        self.assertFalse(hasattr(branch, "__dict__"))
+        with self.assertRaises(AttributeError):
+            branch.not_a_field = 1  # type: ignore
+
 
 class TestStackBranchSet(unittest.TestCase):
     """Tests for StackBranchSet class."""
 
+    def setUp(self):
+        for target, value in (
+            ("get_commit", Commit("abc123")),
+            ("get_remote_info", ("origin", BranchName("main"), Commit("abc123"))),
+        ):
+            patcher = patch(f"stacky.stack.models.{target}", return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     def test_stack_branch_set_creation(self):
         """Test StackBranchSet creation."""
         stack_set = StackBranchSet()
         self.assertEqual(stack_set.stack, {})
-        self.assertEqual(stack_set.tops, set())
-        self.assertEqual(stack_set.bottoms, set())
+        self.assertEqual(stack_set.tops, {})
+        self.assertEqual(stack_set.bottoms, {})
 
-    @patch("stacky.stack.models.get_remote_info")
-    @patch("stacky.stack.models.get_commit")
-    def test_add_branch(self, mock_get_commit, mock_get_remote):
+    def test_add_branch(self):
         """Test adding a branch to the set."""
-        mock_get_commit.return_value = Commit("abc123")
-        mock_get_remote.return_value = ("origin", BranchName("main"), Commit("abc123"))
-
         stack_set = StackBranchSet()
         branch = stack_set.add(
             BranchName("main"),
@@ -116,16 +124,19 @@ class TestStackBranchSet(unittest.TestCase):
         )
 
         self.assertIn(BranchName("main"), stack_set.stack)
-        self.assertIn(branch, stack_set.bottoms)
-        self.assertIn(branch, stack_set.tops)
+        self.assertIs(stack_set.bottoms[branch.name], branch)
+        self.assertIs(stack_set.tops[branch.name], branch)
 
-    @patch("stacky.stack.models.get_remote_info")
-    @patch("stacky.stack.models.get_commit")
-    def test_remove_branch(self, mock_get_commit, mock_get_remote):
-        """Test removing a branch from the set."""
-        mock_get_commit.return_value = Commit("abc123")
-        mock_get_remote.return_value = ("origin", BranchName("main"), Commit("abc123"))
+    def test_bottoms_keep_load_order(self):
+        """Test bottoms iterate in the order they were added."""
+        stack_set = StackBranchSet()
+        for name in ("release", "main", "develop"):
+            stack_set.add(BranchName(name), parent=None, parent_commit=None)
+
+        self.assertEqual([b.name for b in stack_set.bottoms.values()], ["release", "main", "develop"])
 
+    def test_remove_branch(self):
+        """Test removing a branch from the set."""
         stack_set = StackBranchSet()
         branch = stack_set.add(
             BranchName("main"),
@@ -136,14 +147,11 @@ class TestStackBranchSet(unittest.TestCase):
         removed = stack_set.remove(BranchName("main"))
         self.assertEqual(removed, branch)
         self.assertNotIn(BranchName("main"), stack_set.stack)
+        self.assertNotIn(BranchName("main"), stack_set.bottoms)
+        self.assertNotIn(BranchName("main"), stack_set.tops)
 
-    @patch("stacky.stack.models.get_remote_info")
-    @patch("stacky.stack.models.get_commit")
-    def test_add_child(self, mock_get_commit, mock_get_remote):
+    def test_add_child(self):
         """Test adding child relationship."""
-        mock_get_commit.return_value = Commit("abc123")
-        mock_get_remote.return_value = ("origin", BranchName("main"), Commit("abc123"))
-
         stack_set = StackBranchSet()
         parent = stack_set.add(
             BranchName("main"),
@@ -158,8 +166,33 @@ class TestStackBranchSet(unittest.TestCase):
         )
 
         stack_set.add_child(parent, child)
-        self.assertIn(child, parent.children)
-        self.assertNotIn(parent, stack_set.tops)
+        self.assertIs(parent.children[child.name], child)
+        self.assertNotIn(parent.name, stack_set.tops)
+
+    def test_add_child_keeps_name_order(self):
+        """Test children stay ordered by name regardless of insertion order."""
+        stack_set = StackBranchSet()
+        parent = stack_set.add(BranchName("main"), parent=None, parent_commit=None)
+        for name in ("feature-b", "feature-c", "feature-a"):
+            child = stack_set.add(BranchName(name), parent=parent, parent_commit=Commit("abc123"))
+            stack_set.add_child(parent, child)
+
+        self.assertEqual(list(parent.children), ["feature-a", "feature-b", "feature-c"])
+
+    def test_add_children_merges_in_name_order(self):
+        """Test adding several children at once keeps them ordered by name."""
+        stack_set = StackBranchSet()
+        parent = stack_set.add(BranchName("main"), parent=None, parent_commit=None)
+        existing = stack_set.add(BranchName("feature-b"), parent=parent, parent_commit=Commit("abc123"))
+        stack_set.add_child(parent, existing)
+        moved = [
+            stack_set.add(BranchName(name), parent=parent, parent_commit=Commit("abc123"))
+            for name in ("feature-c", "feature-a")
+        ]
+        stack_set.add_children(parent, moved)
+
+        self.assertEqual(list(parent.children), ["feature-a", "feature-b", "feature-c"])
+        self.assertNotIn(parent.name, stack_set.tops)
 
 
 if __name__ == "__main__":
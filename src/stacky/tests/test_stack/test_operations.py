@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Tests for stacky.stack.operations module."""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from stacky.stack.operations import delete_branches, do_push
+
+
+class TestDeleteBranches(unittest.TestCase):
+    """Tests for delete_branches function."""
+
+    def _branch(self, name, parent=None):
+        return SimpleNamespace(name=name, parent=parent, children={})
+
+    @patch("stacky.git.refs.set_parent")
+    @patch("stacky.stack.operations.set_current_branch")
+    @patch("stacky.stack.operations.get_current_branch_name", return_value="b")
+    @patch("stacky.stack.operations.run")
+    def test_deletes_in_one_call_after_leaving_current(self, mock_run, mock_current, mock_set_current, mock_set_parent):
+        """Test every branch is deleted by one `git branch -D`, after checking out a bottom."""
+        main = self._branch("main")
+        a, b = self._branch("a", main), self._branch("b", main)
+        child = self._branch("c", b)
+        b.children = {"c": child}
+        stack = SimpleNamespace(bottoms={"main": main})
+
+        delete_branches(stack, [a, b])
+
+        self.assertEqual(
+            [c.args[0] for c in mock_run.call_args_list],
+            [["git", "checkout", "main"], ["git", "branch", "-D", "a", "b"]],
+        )
+        mock_set_parent.assert_called_once_with("c", "main")
+        self.assertIs(child.parent, main)
+
+    @patch("stacky.stack.operations.get_current_branch_name", return_value="main")
+    @patch("stacky.stack.operations.run")
+    def test_nothing_to_delete(self, mock_run, mock_current):
+        """Test no git command runs when there is nothing to delete."""
+        delete_branches(SimpleNamespace(bottoms={}), [])
+        mock_run.assert_not_called()
+
+
+class TestDoPush(unittest.TestCase):
+    """Tests for do_push function."""
+
+    @patch("stacky.stack.operations.stop_muxed_ssh")
+    @patch("stacky.stack.operations.start_muxed_ssh")
+    @patch("stacky.stack.operations.get_config", return_value=SimpleNamespace(enable_stack_comment=False))
+    @patch("stacky.stack.operations.run", return_value=None)
+    @patch("stacky.stack.operations.cout")
+    @patch("stacky.stack.operations.print_forest")
+    @patch("stacky.stack.operations.load_pr_info_for_forest")
+    @patch("stacky.pr.github.run_pr_edits")
+    @patch("stacky.pr.github.create_gh_pr")
+    @patch("stacky.pr.cache.clear_gh_cache")
+    def test_creating_pr_clears_gh_cache(self, mock_clear, mock_create, *_):
+        """Test a push that creates a PR drops cached `gh` listings afterwards."""
+        main = SimpleNamespace(name="main", parent=None, is_synced_with_parent=lambda: True)
+        feature = MagicMock(open_pr_info=None)
+        feature.name, feature.parent = "feature", main
+        feature.is_synced_with_parent.return_value = True
+        feature.is_synced_with_remote.return_value = True
+        calls = []
+        mock_create.side_effect = lambda *args: calls.append("create")
+        mock_clear.side_effect = lambda: calls.append("clear")
+
+        do_push([{"main": (main, {"feature": (feature, {})})}], force=True, pr=True)
+
+        mock_create.assert_called_once_with(feature, "")
+        self.assertEqual(calls, ["create", "clear"])
+
+
+if __name__ == "__main__":
+    unittest.main()
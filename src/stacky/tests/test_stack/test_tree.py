@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 """Tests for stacky.stack.tree module."""
 
+import threading
 import unittest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
 from stacky.stack.tree import (
     get_pr_status_emoji, make_tree_node, make_subtree, make_tree,
-    format_name, depth_first, forest_depth_first
+    format_name, depth_first, forest_depth_first, load_pr_info_for_forest
 )
 from stacky.utils.types import BranchName, BranchesTree, BranchesTreeForest
 
@@ -49,19 +51,26 @@ class TestMakeTree(unittest.TestCase):
 
     def test_make_subtree_no_children(self):
         """Test make_subtree with no children."""
-        branch = MagicMock()
-        branch.children = set()
+        branch = SimpleNamespace(children={})
         result = make_subtree(branch)
         self.assertEqual(result, {})
 
     def test_make_tree(self):
         """Test make_tree creates correct structure."""
-        branch = MagicMock()
-        branch.name = BranchName("feature")
-        branch.children = set()
+        branch = SimpleNamespace(name=BranchName("feature"), children={})
         result = make_tree(branch)
         self.assertIn("feature", result)
 
+    def test_make_subtree_nested(self):
+        """Test make_subtree builds nested levels in children order."""
+        leaf = SimpleNamespace(name=BranchName("leaf"), children={})
+        b = SimpleNamespace(name=BranchName("b"), children={"leaf": leaf})
+        a = SimpleNamespace(name=BranchName("a"), children={})
+        root = SimpleNamespace(children={"a": a, "b": b})
+        result = make_subtree(root)
+        self.assertEqual(list(result), ["a", "b"])
+        self.assertEqual(result["b"], (b, {"leaf": (leaf, {})}))
+
 
 class TestFormatName(unittest.TestCase):
     """Tests for format_name function."""
@@ -71,7 +80,7 @@ class TestFormatName(unittest.TestCase):
     def test_format_name_current_branch(self, mock_config, mock_current):
         """Test format_name marks current branch."""
         mock_current.return_value = BranchName("feature")
-        mock_config.return_value = MagicMock(compact_pr_display=False)
+        mock_config.return_value = SimpleNamespace(compact_pr_display=False)
 
         branch = MagicMock()
         branch.name = BranchName("feature")
@@ -88,7 +97,7 @@ class TestFormatName(unittest.TestCase):
     def test_format_name_not_synced_parent(self, mock_config, mock_current):
         """Test format_name shows ! when not synced with parent."""
         mock_current.return_value = BranchName("other")
-        mock_config.return_value = MagicMock(compact_pr_display=False)
+        mock_config.return_value = SimpleNamespace(compact_pr_display=False)
 
         branch = MagicMock()
         branch.name = BranchName("feature")
@@ -111,12 +120,23 @@ class TestDepthFirst(unittest.TestCase):
 
     def test_depth_first_single_branch(self):
         """Test depth_first with single branch."""
-        branch = MagicMock()
-        branch.name = BranchName("feature")
+        branch = SimpleNamespace(name=BranchName("feature"))
         tree = BranchesTree({"feature": (branch, BranchesTree({}))})
         result = list(depth_first(tree))
         self.assertEqual(result, [branch])
 
+    def test_depth_first_nested_order(self):
+        """Test depth_first visits parents before children, siblings in order."""
+        a, b, c, d = (SimpleNamespace() for _ in range(4))
+        tree = BranchesTree({
+            "a": (a, BranchesTree({
+                "b": (b, BranchesTree({"c": (c, BranchesTree({}))})),
+                "d": (d, BranchesTree({})),
+            })),
+        })
+        result = list(depth_first(tree))
+        self.assertEqual(result, [a, b, c, d])
+
     def test_forest_depth_first_empty(self):
         """Test forest_depth_first with empty forest."""
         forest = BranchesTreeForest([])
@@ -125,13 +145,43 @@ class TestDepthFirst(unittest.TestCase):
 
     def test_forest_depth_first_single_tree(self):
         """Test forest_depth_first with single tree."""
-        branch = MagicMock()
-        branch.name = BranchName("feature")
+        branch = SimpleNamespace(name=BranchName("feature"))
         tree = BranchesTree({"feature": (branch, BranchesTree({}))})
         forest = BranchesTreeForest([tree])
         result = list(forest_depth_first(forest))
         self.assertEqual(result, [branch])
 
 
+class TestLoadPrInfoForForest(unittest.TestCase):
+    """Tests for load_pr_info_for_forest function."""
+
+    def _forest(self, *branches):
+        return BranchesTreeForest([BranchesTree({b.name: (b, BranchesTree({}))}) for b in branches])
+
+    def test_loads_concurrently(self):
+        """Test every branch is loaded, with the lookups overlapping."""
+        barrier = threading.Barrier(3, timeout=5)
+        branches = []
+        for name in ("a", "b", "c"):
+            b = MagicMock()
+            b.name = name
+            b.load_pr_info.side_effect = lambda: barrier.wait()
+            branches.append(b)
+
+        load_pr_info_for_forest(self._forest(*branches))
+
+        for b in branches:
+            b.load_pr_info.assert_called_once_with()
+
+    def test_failure_propagates(self):
+        """Test a failing lookup is raised to the caller."""
+        b = MagicMock()
+        b.name = "a"
+        b.load_pr_info.side_effect = SystemExit(1)
+
+        with self.assertRaises(SystemExit):
+            load_pr_info_for_forest(self._forest(b))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 """Tests for stacky.utils.config module."""
 
+import io
 import os
 import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import patch
 
@@ -56,6 +59,39 @@ class TestStackyConfig(unittest.TestCase):
         finally:
             os.unlink(f.name)
 
+    def _read(self, text):
+        config = StackyConfig()
+        config.read_config_lines(io.StringIO(text))
+        return config
+
+    def test_read_one_config_ini_syntax(self):
+        """Test comments, key case, ':' delimiters and boolean spellings are handled like configparser."""
+        config = self._read(
+            "# comment\n"
+            "[UI]\n"
+            "; another comment\n"
+            "Skip_Confirm: Yes\n"
+            "enable_stack_comment=off\n"
+            "unknown_option = whatever\n"
+            "use_merge = true\n"
+            "[GIT]\n"
+            "use_merge = 1\n"
+        )
+        self.assertTrue(config.skip_confirm)
+        self.assertFalse(config.enable_stack_comment)
+        self.assertTrue(config.use_merge)
+
+    def test_read_one_config_invalid_boolean(self):
+        """Test a value that isn't a boolean is rejected."""
+        with self.assertRaises(ValueError):
+            self._read("[GIT]\nuse_merge = maybe\n")
+
+    def test_read_one_config_missing_file(self):
+        """Test a missing file leaves the defaults alone."""
+        config = StackyConfig()
+        config.read_one_config("/nonexistent/.stackyconfig")
+        self.assertEqual(config, StackyConfig())
+
 
 class TestReadConfig(unittest.TestCase):
     """Tests for read_config function."""
@@ -72,7 +108,7 @@ class TestReadConfig(unittest.TestCase):
     def test_read_config_with_no_files(self, mock_exists):
         """Test read_config returns defaults when no config files exist."""
         # Mock the get_top_level_dir to raise an exception (not in git repo)
-        with patch("stacky.git.branch.get_top_level_dir", side_effect=Exception("Not in git repo")):
+        with patch("stacky.utils.config.get_top_level_dir", side_effect=Exception("Not in git repo")):
             config = read_config()
             self.assertIsInstance(config, StackyConfig)
             # Should have default values
@@ -99,6 +135,32 @@ class TestGetConfig(unittest.TestCase):
         self.assertEqual(result1, result2)
         mock_read_config.assert_called_once()
 
+    @patch("stacky.utils.config.read_config")
+    def test_get_config_concurrent_first_use(self, mock_read_config):
+        """Test threads racing on first use read the config only once."""
+        barrier = threading.Barrier(4, timeout=5)
+
+        def slow_read():
+            time.sleep(0.05)
+            return StackyConfig()
+
+        mock_read_config.side_effect = slow_read
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(get_config())
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        mock_read_config.assert_called_once()
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(r is results[0] for r in results))
+
 
 if __name__ == "__main__":
     unittest.main()
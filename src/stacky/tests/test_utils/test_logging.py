@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Tests for stacky.utils.logging module."""
+
+import logging
+import unittest
+from unittest.mock import patch
+
+import colors  # type: ignore
+
+from stacky.utils.logging import debug, fmt, info
+
+
+class TestLog(unittest.TestCase):
+    """Tests for the leveled log helpers."""
+
+    def setUp(self):
+        self._old_level = logging.root.level
+        logging.root.setLevel(logging.INFO)
+
+    def tearDown(self):
+        logging.root.setLevel(self._old_level)
+
+    @patch("stacky.utils.logging.fmt")
+    def test_disabled_level_is_not_formatted(self, mock_fmt):
+        """Test messages below the log level are dropped before formatting."""
+        debug("Running: {}", "git status")
+        mock_fmt.assert_not_called()
+
+    def test_enabled_level_is_logged(self):
+        """Test messages at or above the log level are formatted and logged."""
+        with self.assertLogs(level=logging.INFO) as logs:
+            info("Reparenting {} to {}", "a", "b")
+        self.assertEqual(logs.records[0].getMessage(), "Reparenting a to b")
+
+    @patch("stacky.utils.logging.COLOR_STDERR", False)
+    def test_percent_signs_are_literal(self):
+        """Test a "%" in an already formatted message is not treated as a directive."""
+        with self.assertLogs(level=logging.INFO) as logs:
+            info("Rebased {}% of {}", 50, "feature-%s")
+        self.assertEqual(logs.records[0].getMessage(), "Rebased 50% of feature-%s")
+
+
+class TestFmt(unittest.TestCase):
+    """Tests for fmt function."""
+
+    def test_matches_colors_package(self):
+        """Test cached escape codes match what colors.color() produces."""
+        for kwargs in ({"fg": "green"}, {"fg": "gray"}, {"fg": "white", "style": "bold"}, {}):
+            with self.subTest(**kwargs):
+                self.assertEqual(
+                    fmt("#{} {}", 7, "title", color=True, **kwargs),
+                    colors.color("#{} {}", **kwargs).format(7, "title"),
+                )
+
+    def test_no_color(self):
+        """Test color attributes are ignored when color is off."""
+        self.assertEqual(fmt("{}", "main", color=False, fg="red"), "main")
+
+
+if __name__ == "__main__":
+    unittest.main()
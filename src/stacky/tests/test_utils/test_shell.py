@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 """Tests for stacky.utils.shell module."""
 
+import logging
 import shlex
 import subprocess
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 
 from stacky.utils.shell import (
-    _check_returncode, run, run_multiline, run_always_return, remove_prefix
+    _check_returncode, _which, run, run_bytes, run_multiline, run_parallel, run_always_return, remove_prefix
 )
 
 
@@ -70,6 +72,7 @@ class TestRun(unittest.TestCase):
         )
         result = run(["false"], check=False)
         self.assertIsNone(result)
+        self.assertIs(mock_subprocess_run.call_args.kwargs["stderr"], subprocess.DEVNULL)
 
     @patch("subprocess.run")
     @patch("stacky.utils.shell.debug")
@@ -84,6 +87,50 @@ class TestRun(unittest.TestCase):
         result = run_multiline(["echo", "-e", "line1\\nline2"])
         self.assertEqual(result, "line1\nline2\n")
 
+    @patch("subprocess.run")
+    @patch("stacky.utils.shell.debug")
+    def test_run_bytes_returns_raw_output(self, mock_debug, mock_subprocess_run):
+        """Test run_bytes returns undecoded, unstripped output."""
+        mock_subprocess_run.return_value = subprocess.CompletedProcess(
+            args=["gh"],
+            returncode=0,
+            stdout=b"[]\n",
+            stderr=b""
+        )
+        self.assertEqual(run_bytes(["gh"]), b"[]\n")
+
+    @patch("subprocess.run")
+    @patch("stacky.utils.shell.debug")
+    @patch("stacky.utils.shell.shutil.which", return_value="/usr/bin/git")
+    def test_run_resolves_executable_once(self, mock_which, mock_debug, mock_subprocess_run):
+        """Test the program is spawned by absolute path, looked up on PATH only once."""
+        _which.cache_clear()
+        self.addCleanup(_which.cache_clear)
+        mock_subprocess_run.return_value = subprocess.CompletedProcess(
+            args=["git"], returncode=0, stdout=b"", stderr=b""
+        )
+
+        run(["git", "status"])
+        run(["git", "log"])
+
+        mock_which.assert_called_once_with("git")
+        self.assertEqual(mock_subprocess_run.call_args.args[0], ["/usr/bin/git", "log"])
+
+    @patch("subprocess.run")
+    @patch("stacky.utils.shell.shlex.join")
+    def test_run_skips_command_logging_when_debug_off(self, mock_join, mock_subprocess_run):
+        """Test the command line is not rendered for logging unless debug is on."""
+        old_level = logging.root.level
+        logging.root.setLevel(logging.INFO)
+        self.addCleanup(logging.root.setLevel, old_level)
+        mock_subprocess_run.return_value = subprocess.CompletedProcess(
+            args=["git"], returncode=0, stdout=b"", stderr=b""
+        )
+
+        run(["git", "status"])
+
+        mock_join.assert_not_called()
+
     @patch("subprocess.run")
     @patch("stacky.utils.shell.debug")
     def test_run_always_return_asserts_not_none(self, mock_debug, mock_subprocess_run):
@@ -97,6 +144,46 @@ class TestRun(unittest.TestCase):
         result = run_always_return(["echo", "test"])
         self.assertEqual(result, "test")
 
+    @patch("subprocess.run")
+    @patch("stacky.utils.shell.debug")
+    @patch("stacky.utils.shell.die")
+    def test_run_always_return_dies_on_failure(self, mock_die, mock_debug, mock_subprocess_run):
+        """Test run_always_return dies instead of returning None for a failed command."""
+        mock_die.side_effect = SystemExit(1)
+        mock_subprocess_run.return_value = subprocess.CompletedProcess(
+            args=["false"], returncode=1, stdout=b"", stderr=b""
+        )
+        with self.assertRaises(SystemExit):
+            run_always_return(["false"], check=False)
+        mock_die.assert_called_once_with(
+            "Command failed (run with check=False, stderr not captured): {}", "false"
+        )
+
+
+class TestRunParallel(unittest.TestCase):
+    """Tests for run_parallel function."""
+
+    @patch("stacky.utils.shell.run_multiline")
+    def test_runs_concurrently_in_order(self, mock_run):
+        """Test commands overlap and their output comes back in submission order."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_run(cmd, **kwargs):
+            barrier.wait()
+            return cmd[-1]
+
+        mock_run.side_effect = fake_run
+        cmds = [["git", "rev-parse", name] for name in ("a", "b", "c")]
+
+        self.assertEqual(list(run_parallel(cmds, check=False)), ["a", "b", "c"])
+        mock_run.assert_any_call(["git", "rev-parse", "c"], check=False)
+
+    @patch("stacky.utils.shell.run_multiline")
+    def test_no_commands(self, mock_run):
+        """Test nothing runs for an empty list."""
+        self.assertEqual(list(run_parallel([])), [])
+        mock_run.assert_not_called()
+
 
 class TestRemovePrefix(unittest.TestCase):
     """Tests for remove_prefix function."""
@@ -111,12 +198,27 @@ class TestRemovePrefix(unittest.TestCase):
         result = remove_prefix("prefix", "prefix")
         self.assertEqual(result, "")
 
+    @patch("stacky.utils.shell.die")
+    def test_remove_prefix_empty_prefix(self, mock_die):
+        """Test an empty prefix always matches."""
+        self.assertEqual(remove_prefix("main", ""), "main")
+        mock_die.assert_not_called()
+
     @patch("stacky.utils.shell.die")
     def test_remove_prefix_no_match(self, mock_die):
         """Test remove_prefix dies when prefix not found."""
         remove_prefix("other/path", "refs/heads/")
         mock_die.assert_called_once()
 
+    @patch("stacky.utils.shell.die")
+    def test_remove_prefix_no_match_str_subclass(self, mock_die):
+        """Test a missing prefix is caught for str subclasses too."""
+        class Ref(str):
+            pass
+
+        remove_prefix(Ref("other/path"), "refs/heads/")
+        mock_die.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Tests for stacky.utils.state module."""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from stacky.utils.state import save_state
+
+
+class TestSaveState(unittest.TestCase):
+    """Tests for save_state function."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self._tmp.name, "state")
+        self._patches = [
+            patch("stacky.utils.state.STATE_FILE", self.state_file),
+            patch("stacky.utils.state.TMP_STATE_FILE", self.state_file + ".tmp"),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        self._tmp.cleanup()
+
+    def test_writes_json(self):
+        """Test the state round-trips through the state file."""
+        state = {"branch": "feature", "sync": ["a", "b"]}
+        save_state(state)
+        with open(self.state_file) as f:
+            self.assertEqual(json.load(f), state)
+        self.assertFalse(os.path.exists(self.state_file + ".tmp"))
+
+    def test_replaces_previous_state(self):
+        """Test a shorter state fully replaces a longer one."""
+        save_state({"branch": "feature", "fold": {"commits": ["a" * 40] * 10}})
+        save_state({"branch": "x"})
+        with open(self.state_file) as f:
+            self.assertEqual(json.load(f), {"branch": "x"})
+
+
+if __name__ == "__main__":
+    unittest.main()
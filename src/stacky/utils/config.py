@@ -1,13 +1,31 @@
 """Configuration management for stacky."""
 
-import configparser
 import dataclasses
 import os
-from typing import Optional
+import re
+import threading
+from typing import Dict, Iterable, Optional, Tuple
 
+from stacky.git.branch import get_top_level_dir
 from stacky.utils.logging import debug
 
 
+# The options each .stackyconfig section understands; all are booleans.
+_SECTION_KEYS: Dict[str, Tuple[str, ...]] = {
+    "UI": (
+        "skip_confirm", "change_to_main", "change_to_adopted", "share_ssh_session",
+        "compact_pr_display", "enable_stack_comment",
+    ),
+    "GIT": ("use_merge", "use_force_push"),
+}
+# Same spellings configparser's getboolean() accepts.
+_BOOLEAN_STATES = {
+    "1": True, "yes": True, "true": True, "on": True,
+    "0": False, "no": False, "false": False, "off": False,
+}
+_OPTION_RE = re.compile(r"([^=:]+?)\s*[=:]\s*(.*)")
+
+
 @dataclasses.dataclass
 class StackyConfig:
     """Configuration options for stacky."""
@@ -22,30 +40,48 @@ class StackyConfig:
 
     def read_one_config(self, config_path: str):
         """Read configuration from a single file."""
-        rawconfig = configparser.ConfigParser()
-        rawconfig.read(config_path)
-        if rawconfig.has_section("UI"):
-            self.skip_confirm = rawconfig.getboolean("UI", "skip_confirm", fallback=self.skip_confirm)
-            self.change_to_main = rawconfig.getboolean("UI", "change_to_main", fallback=self.change_to_main)
-            self.change_to_adopted = rawconfig.getboolean("UI", "change_to_adopted", fallback=self.change_to_adopted)
-            self.share_ssh_session = rawconfig.getboolean("UI", "share_ssh_session", fallback=self.share_ssh_session)
-            self.compact_pr_display = rawconfig.getboolean("UI", "compact_pr_display", fallback=self.compact_pr_display)
-            self.enable_stack_comment = rawconfig.getboolean("UI", "enable_stack_comment", fallback=self.enable_stack_comment)
+        try:
+            with open(config_path, encoding="UTF-8") as f:
+                self.read_config_lines(f)
+        except OSError:
+            # Unreadable files are skipped, as configparser's read() did.
+            pass
 
-        if rawconfig.has_section("GIT"):
-            self.use_merge = rawconfig.getboolean("GIT", "use_merge", fallback=self.use_merge)
-            self.use_force_push = rawconfig.getboolean("GIT", "use_force_push", fallback=self.use_force_push)
+    def read_config_lines(self, lines: Iterable[str]):
+        """Apply configuration from the lines of a config file (or any text stream)."""
+        keys: Tuple[str, ...] = ()
+        for line in lines:
+            line = line.strip()
+            if not line or line[0] in "#;":
+                continue
+            if line[0] == "[" and line[-1] == "]":
+                keys = _SECTION_KEYS.get(line[1:-1], ())
+                continue
+            match = _OPTION_RE.match(line)
+            if match is None:
+                continue
+            key = match.group(1).lower()
+            if key not in keys:
+                continue
+            value = match.group(2).lower()
+            if value not in _BOOLEAN_STATES:
+                raise ValueError(f"Not a boolean: {value}")
+            setattr(self, key, _BOOLEAN_STATES[value])
 
 
 # Global config singleton
 CONFIG: Optional[StackyConfig] = None
+_CONFIG_LOCK = threading.Lock()
 
 
 def get_config() -> StackyConfig:
     """Get the global configuration, loading it if necessary."""
     global CONFIG
     if CONFIG is None:
-        CONFIG = read_config()
+        # Worker threads (e.g. PR lookups) may race to load it; only one reads the files.
+        with _CONFIG_LOCK:
+            if CONFIG is None:
+                CONFIG = read_config()
     return CONFIG
 
 
@@ -55,7 +91,6 @@ def read_config() -> StackyConfig:
     config_paths = [os.path.expanduser("~/.stackyconfig")]
 
     try:
-        from stacky.git.branch import get_top_level_dir
         root_dir = get_top_level_dir()
         config_paths.append(f"{root_dir}/.stackyconfig")
     except Exception:
@@ -1,5 +1,6 @@
 """Logging and output utilities for stacky."""
 
+import functools
 import logging
 import os
 import sys
@@ -9,9 +10,12 @@ import colors  # type: ignore
 _LOGGING_FORMAT = "%(asctime)s %(module)s %(levelname)s: %(message)s"
 
 # Terminal state - can be modified by main()
-COLOR_STDOUT: bool = os.isatty(1)
-COLOR_STDERR: bool = os.isatty(2)
-IS_TERMINAL: bool = os.isatty(1) and os.isatty(2)
+_STDOUT_IS_TTY, _STDERR_IS_TTY = os.isatty(1), os.isatty(2)
+COLOR_STDOUT: bool = _STDOUT_IS_TTY
+COLOR_STDERR: bool = _STDERR_IS_TTY
+IS_TERMINAL: bool = _STDOUT_IS_TTY and _STDERR_IS_TTY
+# Checked once: stdin is not expected to be swapped for another fd mid-run.
+IS_STDIN_TTY: bool = os.isatty(0)
 
 
 def set_color_mode(mode: str):
@@ -26,9 +30,22 @@ def set_color_mode(mode: str):
     # 'auto' keeps the default based on isatty
 
 
+_ANSI_RESET = "\x1b[0m"
+
+
+@functools.lru_cache(maxsize=None)
+def _ansi_prefix(fg, bg, style) -> str:
+    """The escape sequence colors.color() opens with for these attributes, or ""."""
+    return colors.color("", fg=fg, bg=bg, style=style).removesuffix(_ANSI_RESET)
+
+
 def fmt(s: str, *args, color: bool = False, fg=None, bg=None, style=None, **kwargs) -> str:
     """Format a string with optional color."""
-    s = colors.color(s, fg=fg, bg=bg, style=style) if color else s
+    if color:
+        # Only a handful of fg/bg/style combinations are used; build each escape code once.
+        prefix = _ansi_prefix(fg, bg, style)
+        if prefix:
+            s = prefix + s + _ANSI_RESET
     return s.format(*args, **kwargs)
 
 
@@ -37,29 +54,33 @@ def cout(*args, **kwargs):
     return sys.stdout.write(fmt(*args, color=COLOR_STDOUT, **kwargs))
 
 
-def _log(fn, *args, **kwargs):
+def _log(level: int, *args, **kwargs):
     """Internal log helper."""
-    return fn("%s", fmt(*args, color=COLOR_STDERR, **kwargs))
+    # Skip formatting (and coloring) messages that would be dropped anyway.
+    if not logging.root.isEnabledFor(level):
+        return
+    # Already formatted; with no args, LogRecord.getMessage() leaves any "%" alone.
+    return logging.log(level, fmt(*args, color=COLOR_STDERR, **kwargs))
 
 
 def debug(*args, **kwargs):
     """Log debug message."""
-    return _log(logging.debug, *args, fg="green", **kwargs)
+    return _log(logging.DEBUG, *args, fg="green", **kwargs)
 
 
 def info(*args, **kwargs):
     """Log info message."""
-    return _log(logging.info, *args, fg="green", **kwargs)
+    return _log(logging.INFO, *args, fg="green", **kwargs)
 
 
 def warning(*args, **kwargs):
     """Log warning message."""
-    return _log(logging.warning, *args, fg="yellow", **kwargs)
+    return _log(logging.WARNING, *args, fg="yellow", **kwargs)
 
 
 def error(*args, **kwargs):
     """Log error message."""
-    return _log(logging.error, *args, fg="red", **kwargs)
+    return _log(logging.ERROR, *args, fg="red", **kwargs)
 
 
 class ExitException(BaseException):
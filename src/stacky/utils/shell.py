@@ -1,9 +1,13 @@
 """Shell execution utilities for stacky."""
 
+import functools
+import logging
 import shlex
+import shutil
 import subprocess
 import sys
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
 
 from stacky.utils.logging import debug, die
 from stacky.utils.types import CmdArgs
@@ -21,30 +25,62 @@ def _check_returncode(sp: subprocess.CompletedProcess, cmd: CmdArgs):
         die("Exited with status {}: {}. Stderr was:\n{}", rc, shlex.join(cmd), stderr)
 
 
-def run_multiline(cmd: CmdArgs, *, check: bool = True, null: bool = True, out: bool = False) -> Optional[str]:
-    """Run a command and return its output (with newlines preserved)."""
-    debug("Running: {}", shlex.join(cmd))
+@functools.lru_cache(maxsize=None)
+def _which(program: str) -> str:
+    """Absolute path of `program`, looked up on PATH once per process."""
+    # Spawning by bare name makes execvp() try each PATH entry in turn, on every call.
+    return shutil.which(program) or program
+
+
+def run_bytes(
+    cmd: CmdArgs, *, check: bool = True, null: bool = True, out: bool = False, input: Optional[str] = None
+) -> Optional[bytes]:
+    """Run a command and return its raw, undecoded output."""
+    # debug() drops the line when disabled, but shlex.join() would still run.
+    if logging.root.isEnabledFor(logging.DEBUG):
+        debug("Running: {}", shlex.join(cmd))
     sys.stdout.flush()
     sys.stderr.flush()
     sp = subprocess.run(
-        cmd,
+        [_which(cmd[0]), *cmd[1:]],
         stdout=1 if out else subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        # Stderr is only shown when a checked command fails; otherwise don't collect it.
+        stderr=subprocess.PIPE if check else subprocess.DEVNULL,
+        input=input.encode("UTF-8") if input is not None else None,
     )
     if check:
         _check_returncode(sp, cmd)
-    rc = sp.returncode
-    if rc != 0:
+    if sp.returncode != 0:
         return None
-    if sp.stdout is None:
-        return ""
-    return sp.stdout.decode("UTF-8")
+    # stdout is None when it went straight to the terminal (out=True).
+    return sp.stdout or b""
+
+
+def run_multiline(
+    cmd: CmdArgs, *, check: bool = True, null: bool = True, out: bool = False, input: Optional[str] = None
+) -> Optional[str]:
+    """Run a command and return its output (with newlines preserved)."""
+    raw = run_bytes(cmd, check=check, null=null, out=out, input=input)
+    return None if raw is None else raw.decode("UTF-8")
+
+
+def run_parallel(cmds: List[CmdArgs], **kwargs) -> Iterator[Optional[str]]:
+    """Run independent commands concurrently, yielding each one's run_multiline() output in order."""
+    if not cmds:
+        return
+    # The processes spend their time waiting on git or GitHub, so the slowest one sets the pace.
+    with ThreadPoolExecutor(max_workers=min(8, len(cmds))) as executor:
+        yield from executor.map(lambda cmd: run_multiline(cmd, **kwargs), cmds)
 
 
 def run_always_return(cmd: CmdArgs, **kwargs) -> str:
-    """Run a command and always return output (asserts it's not None)."""
+    """Run a command and always return output, dying if it failed."""
     out = run(cmd, **kwargs)
-    assert out is not None
+    # Only reachable with check=False; an explicit check survives `python -O`.
+    if out is None:
+        # Unchecked commands send stderr to DEVNULL, so there is none to show here.
+        die("Command failed (run with check=False, stderr not captured): {}", shlex.join(cmd))
+        assert out is not None
     return out
 
 
@@ -0,0 +1,22 @@
+"""Persistence of in-progress operations for `stacky continue`."""
+
+import json
+import os
+
+from stacky.utils.types import STATE_FILE, TMP_STATE_FILE
+
+
+def save_state(state: dict):
+    """Atomically replace the state file with `state`.
+
+    Sync and fold save their progress here before a step that may stop for
+    `stacky continue`; readers only ever see a complete file.
+    """
+    data = memoryview(json.dumps(state).encode("UTF-8"))
+    fd = os.open(TMP_STATE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+    os.replace(TMP_STATE_FILE, STATE_FILE)
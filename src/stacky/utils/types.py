@@ -2,12 +2,16 @@
 
 import logging
 import os
-from typing import Dict, FrozenSet, List, NewType, Tuple, Union
+from typing import Dict, FrozenSet, List, NewType, Tuple, TYPE_CHECKING, Union
 
 # Type aliases
-BranchName = NewType("BranchName", str)
-PathName = NewType("PathName", str)
-Commit = NewType("Commit", str)
+if TYPE_CHECKING:
+    BranchName = NewType("BranchName", str)
+    PathName = NewType("PathName", str)
+    Commit = NewType("Commit", str)
+else:
+    # At runtime these are plain str: str(s) hands back s itself, without a Python-level call.
+    BranchName = PathName = Commit = str
 CmdArgs = NewType("CmdArgs", List[str])
 
 # Forward reference types (actual types defined in stack/models.py)
@@ -23,6 +27,7 @@ JSON = Union[Dict[str, "JSON"], List["JSON"], str, int, float, bool, None]
 MAX_SSH_MUX_LIFETIME = 120  # 2 minutes ought to be enough for anybody ;-)
 STATE_FILE = os.path.expanduser("~/.stacky.state")
 TMP_STATE_FILE = STATE_FILE + ".tmp"
+CACHE_DIR = os.path.expanduser("~/.cache/stacky")
 
 # Stack bottoms - mutable set that can be extended
 STACK_BOTTOMS: set[BranchName] = set([BranchName("master"), BranchName("main")])
@@ -1,6 +1,5 @@
 """User interface utilities for stacky."""
 
-import os
 import sys
 from typing import TYPE_CHECKING
 
@@ -8,7 +7,7 @@ import asciitree  # type: ignore
 from simple_term_menu import TerminalMenu  # type: ignore
 
 from stacky.utils.config import get_config
-from stacky.utils.logging import IS_TERMINAL, cout, die
+from stacky.utils.logging import COLOR_STDOUT, IS_STDIN_TTY, IS_TERMINAL, cout, die, fmt
 
 if TYPE_CHECKING:
     from stacky.stack.models import StackBranch
@@ -17,12 +16,13 @@ if TYPE_CHECKING:
 
 def prompt(message: str, default_value: str | None) -> str:
     """Prompt the user for input."""
-    cout(message)
+    # Build the whole prompt so it goes out in one write.
+    s = fmt(message, color=COLOR_STDOUT)
     if default_value is not None:
-        cout("({})", default_value, fg="gray")
-        cout(" ")
+        s += fmt("({})", default_value, color=COLOR_STDOUT, fg="gray") + " "
+    sys.stdout.write(s)
+    sys.stdout.flush()
     while True:
-        sys.stderr.flush()
         r = input().strip()
 
         if len(r) > 0:
@@ -35,12 +35,13 @@ def confirm(msg: str = "Proceed?"):
     """Ask for confirmation. Skips if skip_confirm is set."""
     if get_config().skip_confirm:
         return
-    if not os.isatty(0):
+    if not IS_STDIN_TTY:
         die("Standard input is not a terminal, use --force option to force action")
     print()
     while True:
         cout("{} [yes/no] ", msg, fg="yellow")
-        sys.stderr.flush()
+        # The prompt went to stdout, so that is the stream to flush before reading.
+        sys.stdout.flush()
         r = input().strip().lower()
         if r == "yes" or r == "y":
             break
@@ -68,21 +69,14 @@ def menu_choose_branch(forest: "BranchesTreeForest") -> "StackBranch":
     if not IS_TERMINAL:
         die("May only choose from menu when using a terminal")
 
-    s = ""
-    lines = []
-    for tree in forest:
-        s = ASCII_TREE(format_tree(tree))
-        lines += [l.rstrip() for l in s.split("\n")]
-    lines.reverse()
-
-    # Find current branch marker
-    from stacky.git.branch import get_current_branch_name
-    current = get_current_branch_name()
-    initial_index = 0
-    for i, l in enumerate(lines):
-        if "*" in l:  # lol
-            initial_index = i
-            break
+    # Upside down, like print_tree(): the last rendered line comes first.
+    s = "\n".join(ASCII_TREE(format_tree(tree)) for tree in forest)
+    lines = [l.rstrip() for l in reversed(s.splitlines())]
+
+    # Start on the current branch: the first line with format_name()'s "*" marker.
+    text = "\n".join(lines)
+    star = text.find("*")
+    initial_index = text.count("\n", 0, star) if star >= 0 else 0
 
     menu = TerminalMenu(lines, cursor_index=initial_index)
     idx = menu.show()